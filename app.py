@@ -1,17 +1,19 @@
 import streamlit as st
-import pandas as pd
 from urllib.parse import quote_plus
+from src.app_data import data_prep, get_app_data, get_search_index, get_season_search_mask
 
 st.set_page_config(layout="wide")
 st.title("Welcome to ATP Analyze")
 
-df = pd.read_csv("src/output/player_dataset.csv")
-players_2024 = df[df['tourney_date'].astype(str).str.startswith('2024')]
-unique_players = sorted(set(players_2024['winner_name']).union(set(players_2024['loser_name'])))
+with data_prep("home"):
+    data = get_app_data()
+    players_2024 = data.season(2024)
 
 search_name = st.text_input("🔍 Search Player by Name:")
 if search_name:
-    matched = [p for p in unique_players if search_name.lower() in p.lower()]
+    # players with a 2024 match, best match first (accents / case / typos ignored)
+    results = get_search_index().search(search_name, limit=20, allowed=get_season_search_mask(2024))
+    matched = [data.match_names[player_id] for _, player_id, _ in results]
     if matched:
         for name in matched:
             player_link = f"/player_dashboard?player={quote_plus(name)}"
@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 from urllib.parse import quote_plus
-from src.model.predict_win_probability import predict_win_probability, get_player_stats, calculate_h2h_winrate
+from src.app_data import data_prep, get_app_data
+from src.model.predict_win_probability import predict_win_probability, get_player_stats, calculate_h2h_winrate, player_index
 
 st.set_page_config(layout="wide")
 st.title("Player Comparison")
@@ -9,9 +9,11 @@ st.title("Player Comparison")
 # -------------------------------
 # Load dataset
 # -------------------------------
-df = pd.read_csv("src/output/feature_dataset_light.csv")
-players_2024 = df[df['tourney_date'].astype(str).str.startswith('2024')]
-unique_players = sorted(set(players_2024['winner_name']).union(set(players_2024['loser_name'])))
+with data_prep("match_predictor"):
+    data = get_app_data()
+    df = data.matches
+    # 2024 players the model has features for
+    unique_players = [p for p in data.active_players(2024) if p in player_index]
 
 
 query_params = st.query_params
@@ -48,6 +50,7 @@ with col1:
     - **Height:** {stats_p1["height"]} cm
     - **Hand:** {stats_p1["hand"]}
     - **Recent winrate:** {stats_p1["recent_winrate"]*100:.1f}%
+    - **Elo:** {stats_p1["elo"]:.0f}
     - **H2H winrate vs {player2}:** {calculate_h2h_winrate(player1, player2)*100:.1f}%
     """)
 
@@ -59,6 +62,7 @@ with col2:
     - **Height:** {stats_p2["height"]} cm
     - **Hand:** {stats_p2["hand"]}
     - **Recent winrate:** {stats_p2["recent_winrate"]*100:.1f}%
+    - **Elo:** {stats_p2["elo"]:.0f}
     - **H2H winrate vs {player1}:** {calculate_h2h_winrate(player2, player1)*100:.1f}%
     """)
 
@@ -80,14 +84,14 @@ if st.button("🎾 Predict Match Outcome"):
 
     # -------------------------------
     # -------------------------------
+    id1, id2 = data.player_id(player1), data.player_id(player2)
     h2h_matches = df[
-        ((df["winner_name"] == player1) & (df["loser_name"] == player2)) |
-        ((df["winner_name"] == player2) & (df["loser_name"] == player1))
+        ((df["winner_id"] == id1) & (df["loser_id"] == id2)) |
+        ((df["winner_id"] == id2) & (df["loser_id"] == id1))
     ].sort_values("tourney_date", ascending=False).head(5)
 
     if not h2h_matches.empty:
         st.subheader(f"🕑 Last {len(h2h_matches)} H2H Matches")
-        h2h_matches['tourney_date'] = pd.to_datetime(h2h_matches['tourney_date'], format='%Y%m%d', errors='coerce')
         table = h2h_matches[['tourney_date', 'tourney_name', 'winner_name', 'loser_name', 'score']].copy()
         table.columns = ["Date", "Tournament", "Winner", "Loser", "Score"]
         table['Date'] = table['Date'].dt.strftime('%Y-%m-%d')
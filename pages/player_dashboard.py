@@ -3,6 +3,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 from urllib.parse import quote_plus
+from src.app_data import data_prep, get_app_data, get_search_index
 
 # -------------------------------
 # -------------------------------
@@ -38,17 +39,6 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# -------------------------------
-# -------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv('src/output/player_dataset.csv')
-    player_static_df = pd.read_csv('data/atp_players.csv')
-    df['tourney_date'] = pd.to_datetime(df['tourney_date'].astype(str), format='%Y%m%d', errors='coerce')
-    return df, player_static_df
-
-df, player_static_df = load_data()
-
 # -------------------------------
 # -------------------------------
 query_params = st.query_params
@@ -62,27 +52,20 @@ if not player_name:
 # -------------------------------
 st.header(f"{player_name} - Summary")
 
-player_matches = df[(df['winner_name'] == player_name) | (df['loser_name'] == player_name)].copy()
-player_matches = player_matches.dropna(subset=['tourney_date'])
-player_matches['year'] = player_matches['tourney_date'].dt.year
-
-total_matches = len(player_matches)
-total_wins = (player_matches['winner_name'] == player_name).sum()
-winrate = round(total_wins / total_matches * 100, 2) if total_matches else 0
+with data_prep("player_dashboard"):
+    data = get_app_data()
+    # names are resolved to player ids once, everything below is keyed by id
+    player_id = data.player_id(player_name)
+    if player_id is None:
+        player_id = get_search_index().resolve(player_name)
+    tables = data.player_tables
+    total_matches, total_wins, winrate = tables.summary(player_id)
+    winrate_per_year = tables.winrate_by_year(player_id)
+    surface_win_counts = tables.surface_wins(player_id)
+    recent_matches = tables.recent(player_id)
 
 # 获取静态信息
-def get_static_info(name, static_df):
-    try:
-        first, last = name.split()
-        match = static_df[
-            (static_df['name_first'].str.lower() == first.lower()) &
-            (static_df['name_last'].str.lower() == last.lower())
-        ]
-        return match.iloc[0] if not match.empty else None
-    except:
-        return None
-
-static_info = get_static_info(player_name, player_static_df)
+static_info = None if player_id is None else data.static_info(player_id)
 
 col1, col2, col3 = st.columns(3)
 
@@ -127,16 +110,13 @@ if st.button("🔄 Compare Players"):
 # -------------------------------
 with col2:
     st.subheader("📈 Winrate by Year")
-    if not player_matches.empty:
-        wins_per_year = player_matches[player_matches['winner_name'] == player_name].groupby('year').size()
-        matches_per_year = player_matches.groupby('year').size()
-        winrate_per_year = (wins_per_year / matches_per_year).fillna(0) * 100
+    if not winrate_per_year.empty:
         fig, ax = plt.subplots()
-        winrate_per_year.sort_index().plot(ax=ax, marker='o')
+        winrate_per_year.plot(ax=ax, marker='o')
         ax.set_ylabel('Winrate (%)')
         ax.set_xlabel('Year')
         ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-        ax.set_xlim(player_matches['year'].min(), player_matches['year'].max())
+        ax.set_xlim(winrate_per_year.index.min(), winrate_per_year.index.max())
         st.pyplot(fig)
     else:
         st.info("No yearly data available.")
@@ -146,8 +126,6 @@ with col2:
 # -------------------------------
 with col3:
     st.subheader("🎾 Surface Winrate Distribution")
-    surface_matches = player_matches.dropna(subset=['surface'])
-    surface_win_counts = surface_matches[surface_matches['winner_name'] == player_name]['surface'].value_counts()
     if not surface_win_counts.empty:
         fig2, ax2 = plt.subplots()
         surface_win_counts.plot(kind='pie', autopct='%1.1f%%', ax=ax2)
@@ -159,15 +137,13 @@ with col3:
 # -------------------------------
 # -------------------------------
 st.subheader('📋 Recent 20 Matches (Wins First)')
-player_matches['win_flag'] = (player_matches['winner_name'] == player_name).astype(int)
-recent_matches_sorted = player_matches.sort_values(by=['win_flag', 'tourney_date'], ascending=[False, False])
-recent_matches_sorted['tourney_date'] = recent_matches_sorted['tourney_date'].dt.strftime('%Y-%m-%d')
 
 def make_link(name):
     return f"[{name}](?player={quote_plus(name.strip())})"
 
-table = recent_matches_sorted[['tourney_date', 'tourney_name', 'surface', 'winner_name', 'loser_name', 'score']].head(20).copy()
+table = recent_matches[['tourney_date', 'tourney_name', 'surface', 'winner_name', 'loser_name', 'score']].copy()
 table.columns = ['Date', 'Tournament', 'Surface', 'Winner', 'Loser', 'Score']
+table['Date'] = table['Date'].dt.strftime('%Y-%m-%d')
 table['Winner'] = table['Winner'].astype(str).apply(make_link)
 table['Loser'] = table['Loser'].astype(str).apply(make_link)
 st.markdown(table.to_markdown(index=False), unsafe_allow_html=True)
@@ -175,25 +151,11 @@ st.markdown(table.to_markdown(index=False), unsafe_allow_html=True)
 # -------------------------------
 # -------------------------------
 st.subheader('🎯 Opponent Analysis')
-player_matches['opponent'] = player_matches.apply(
-    lambda row: row['loser_name'] if row['winner_name'] == player_name else row['winner_name'],
-    axis=1
-)
-opponent_counts = player_matches['opponent'].value_counts()
-wins_vs_opponent = player_matches[player_matches['winner_name'] == player_name]['loser_name'].value_counts()
-
-opponent_df = pd.DataFrame({
-    'Matches': opponent_counts,
-    'Wins': wins_vs_opponent
-}).fillna(0)
-opponent_df['Winrate (%)'] = (opponent_df['Wins'] / opponent_df['Matches'] * 100).round(2)
-opponent_df = opponent_df.astype({'Matches': int, 'Wins': int})
-
 st.write('**Top 5 Most Played Opponents:**')
-st.dataframe(opponent_df.sort_values(by='Matches', ascending=False).head(5))
+st.dataframe(tables.opponent_table(tables.most_played, player_id))
 
 st.write('**Top 5 Toughest Opponents (min 5 matches):**')
-st.dataframe(opponent_df[opponent_df['Matches'] >= 5].sort_values(by='Winrate (%)').head(5))
+st.dataframe(tables.opponent_table(tables.toughest, player_id))
 
 st.write('**Top 5 Easiest Opponents (min 5 matches):**')
-st.dataframe(opponent_df[opponent_df['Matches'] >= 5].sort_values(by='Winrate (%)', ascending=False).head(5))
+st.dataframe(tables.opponent_table(tables.easiest, player_id))
@@ -0,0 +1,60 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from src.app_data import data_prep, get_app_data
+from src.model.predict_win_probability import player_index
+from src.model.tournament_simulator import build_draw, simulate_tournament
+
+st.set_page_config(layout="wide")
+st.title("Tournament Simulator")
+
+# -------------------------------
+# Active players, best ranked first
+# -------------------------------
+with data_prep("tournament_simulator"):
+    unique_players = [p for p in get_app_data().active_players(2024) if p in player_index]
+    ranks = player_index.column("rank", player_index.positions(unique_players))
+    ranked_players = [unique_players[i] for i in np.argsort(ranks, kind="stable")]
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    draw_size = st.selectbox("Draw size", [32, 64, 128], index=0)
+
+with col2:
+    n_seeds = st.selectbox("Seeds", [0, 8, 16, 32], index=1)
+
+with col3:
+    n_sims = st.select_slider("Simulations", options=[10000, 50000, 100000, 200000], value=100000)
+
+field = st.multiselect(
+    "Players (defaults to the top ranked players, fewer players than the draw size get byes)",
+    ranked_players,
+    default=ranked_players[:draw_size],
+    max_selections=draw_size,
+)
+
+# -------------------------------
+# Simulate
+# -------------------------------
+if st.button("🎾 Simulate Tournament"):
+    if len(field) < 2:
+        st.warning("Select at least two players.")
+        st.stop()
+
+    # seeds follow the current ranking
+    field_ranked = sorted(field, key=ranked_players.index)
+    draw = build_draw(field_ranked, draw_size, seeds=field_ranked[:min(n_seeds, draw_size // 2)], rng=0)
+
+    with st.spinner(f"Running {n_sims:,} simulations..."):
+        result = simulate_tournament(draw, n_sims, seed=0)
+
+    st.subheader("🏆 Title Odds")
+    st.bar_chart(result["W"].head(10))
+
+    st.subheader("📋 Probability of Reaching Each Round")
+    st.dataframe((result * 100).round(1).astype(str) + "%")
+
+    with st.expander("Draw"):
+        pairs = [(draw[i] or "Bye", draw[i + 1] or "Bye") for i in range(0, draw_size, 2)]
+        st.table(pd.DataFrame(pairs, columns=["Player", "Opponent"]))
@@ -0,0 +1,109 @@
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data_engineer.match_store import ROOT_DIR, load_matches
+from src.data_engineer.player_analytics import PlayerTables
+from src.data_engineer.player_search import PlayerSearchIndex
+
+PLAYERS_PATH = os.path.join(ROOT_DIR, 'data', 'atp_players.csv')
+MATCH_COLUMNS = ['tourney_date', 'tourney_name', 'surface', 'winner_id', 'winner_name', 'loser_id', 'loser_name', 'score']
+
+# page -> seconds spent preparing its data on the last run
+prep_timings = {}
+
+
+class AppData:
+    """
+    Everything the pages read, loaded once per process and shared by every session.
+    Treat it as read only: take a .copy() before adding columns.
+
+    matches:  match store rows (MATCH_COLUMNS plus 'year'), tourney_date as datetime,
+              sorted by date so a season is one contiguous slice
+    players:  data/atp_players.csv (static info: hand, dob, height, country)
+    player_tables: per-player dashboard aggregates (player_analytics.PlayerTables)
+    """
+
+    def __init__(self, matches, players):
+        self.matches = matches
+        self.players = players
+        self.player_tables = PlayerTables(matches)
+
+        years = matches['year'].to_numpy()
+        self.seasons = sorted(int(y) for y in np.unique(years))
+        self.latest_season = self.seasons[-1]
+        bounds = np.searchsorted(years, self.seasons + [self.seasons[-1] + 1])
+        self._season_rows = {year: (bounds[i], bounds[i + 1]) for i, year in enumerate(self.seasons)}
+
+        # players with at least one match in each season, sorted by name
+        names_all = np.concatenate([matches['winner_name'].astype(str).to_numpy(),
+                                    matches['loser_name'].astype(str).to_numpy()])
+        names = pd.DataFrame({'year': np.concatenate([years, years]), 'name': names_all}).drop_duplicates()
+        self._active = {int(year): sorted(group) for year, group in names.groupby('year')['name']}
+
+        # player_id -> name in the match data (latest spelling), and -> row of `players`
+        self.match_names = self.player_tables.names
+        self._player_rows = {pid: i for i, pid in enumerate(players['player_id'].tolist())}
+
+    def season(self, year=None):
+        """Matches of one season (default: the latest), a view of `matches`."""
+        start, stop = self._season_rows.get(self.latest_season if year is None else year, (0, 0))
+        return self.matches.iloc[start:stop]
+
+    def active_players(self, year=None):
+        """Sorted names of every player with a match in `year` (default: the latest season)."""
+        return self._active.get(self.latest_season if year is None else year, [])
+
+    def player_id(self, name):
+        """player_id behind a name as spelled in the match data, or None."""
+        return self.player_tables.ids.get(name)
+
+    def static_info(self, player_id):
+        """Row of `players` for a player_id, or None."""
+        row = self._player_rows.get(player_id)
+        return None if row is None else self.players.iloc[row]
+
+
+def build_app_data():
+    matches = load_matches(columns=MATCH_COLUMNS)
+    matches['tourney_date'] = pd.to_datetime(matches['tourney_date'].astype(str), format='%Y%m%d', errors='coerce')
+    matches = matches.dropna(subset=['tourney_date']).sort_values('tourney_date', kind='stable').reset_index(drop=True)
+    matches['year'] = matches['tourney_date'].dt.year.astype('int16')
+    players = pd.read_csv(PLAYERS_PATH, dtype={'wikidata_id': str})
+    return AppData(matches, players)
+
+
+@st.cache_resource(show_spinner="Loading match data...")
+def get_app_data():
+    """The process-wide AppData (st.cache_resource: one copy, never copied per session)."""
+    return build_app_data()
+
+
+@st.cache_resource(show_spinner="Building the player search index...")
+def get_search_index():
+    """Search index over atp_players.csv and the names in the match data."""
+    data = get_app_data()
+    return PlayerSearchIndex.from_frames(data.players, data.matches)
+
+
+@st.cache_resource(show_spinner=False)
+def get_season_search_mask(year):
+    """Entries of the search index of the players with a match in `year` (PlayerSearchIndex.mask)."""
+    season = get_app_data().season(year)
+    return get_search_index().mask(np.union1d(season['winner_id'].to_numpy(), season['loser_id'].to_numpy()))
+
+
+@contextmanager
+def data_prep(page):
+    """
+    Time a page's data preparation; the result is kept in prep_timings and shown
+    in the sidebar.
+    """
+    start = time.perf_counter()
+    yield
+    prep_timings[page] = time.perf_counter() - start
+    st.sidebar.caption(f"Data prep: {prep_timings[page] * 1e3:.0f} ms")
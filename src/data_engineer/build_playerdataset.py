@@ -1,22 +1,17 @@
 import os
-import pandas as pd
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
 
-data_folder = os.path.join('../..', 'data', 'atp1_2000-2024')
+from src.data_engineer.match_store import DATA_DIR, STORE_DIR, build_match_store, load_table
 
 
-all_files = [os.path.join(data_folder, f) for f in os.listdir(data_folder) if f.endswith('.csv')]
+# Convert every yearly csv into the typed, year-partitioned match store
+years = build_match_store(DATA_DIR, STORE_DIR)
 
+table = load_table()
+print(f"✅ Combined Data Shape: ({table.num_rows}, {table.num_columns})")
+print(f"✅ Columns: {table.column_names}")
+print(f"✅ Years: {years[0]}-{years[-1]}")
 
-df_list = [pd.read_csv(file) for file in all_files]
-df = pd.concat(df_list, ignore_index=True)
-
-
-print(f"✅ Combined Data Shape: {df.shape}")
-print(f"✅ Columns: {df.columns.tolist()}")
-
-
-output_path = os.path.join('../..', 'src', 'output','player_dataset.csv')
-df.to_csv(output_path, index=False)
-
-print(f"✅ Saved merged player dataset to {output_path}")
+print(f"✅ Saved match store to {STORE_DIR}")
@@ -0,0 +1,197 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineer.match_order import chronological_order
+
+INITIAL_RATING = 1500.0
+
+# K factor of a player's n-th rated match: K_SCALE / (n + K_OFFSET) ** K_SHAPE, so
+# ratings of new players move fast and settle as they play more
+K_SCALE = 250.0
+K_OFFSET = 5.0
+K_SHAPE = 0.4
+
+# surfaces with their own rating; matches on any other (or no) surface only move the overall one
+SURFACES = ['Hard', 'Clay', 'Grass', 'Carpet']
+SURFACE_CODES = {surface: i for i, surface in enumerate(SURFACES)}
+
+# pre-match ratings added by the feature pipeline
+ELO_COLUMNS = ['winner_elo', 'loser_elo', 'winner_surface_elo', 'loser_surface_elo']
+
+
+def expected_score(rating, opponent_rating):
+    """Probability that a player rated `rating` beats one rated `opponent_rating`."""
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def k_factor(matches):
+    return K_SCALE / (np.asarray(matches) + K_OFFSET) ** K_SHAPE
+
+
+class EloRatings:
+    """
+    Overall and per-surface Elo rating of every player, updated one result at a time.
+
+    State is array backed: each player id gets a row (self.slot) into the rating and
+    match count arrays, one column per surface for the surface ratings, so reading or
+    updating a player is a dict access plus array reads. Players never seen are
+    rated INITIAL_RATING.
+    """
+
+    def __init__(self, capacity=1024):
+        self.slot = {}   # player id -> row
+        self.rating = np.full(capacity, INITIAL_RATING)
+        self.matches = np.zeros(capacity, dtype=np.int32)
+        self.surface_rating = np.full((capacity, len(SURFACES)), INITIAL_RATING)
+        self.surface_matches = np.zeros((capacity, len(SURFACES)), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.slot)
+
+    def _grow(self, size):
+        capacity = len(self.rating)
+        if size <= capacity:
+            return
+        extra = max(size, 2 * capacity) - capacity
+        self.rating = np.concatenate([self.rating, np.full(extra, INITIAL_RATING)])
+        self.matches = np.concatenate([self.matches, np.zeros(extra, dtype=np.int32)])
+        self.surface_rating = np.vstack([self.surface_rating, np.full((extra, len(SURFACES)), INITIAL_RATING)])
+        self.surface_matches = np.vstack([self.surface_matches, np.zeros((extra, len(SURFACES)), dtype=np.int32)])
+
+    def _slot(self, player_id):
+        row = self.slot.get(player_id)
+        if row is None:
+            row = self.slot[player_id] = len(self.slot)
+            self._grow(row + 1)
+        return row
+
+    def _slots(self, player_ids):
+        """Rows of many player ids at once, new players get the next free rows."""
+        unique, inverse = np.unique(np.asarray(player_ids, dtype=np.int64), return_inverse=True)
+        rows = np.array([self._slot(player_id) for player_id in unique.tolist()], dtype=np.int64)
+        return rows[inverse] if len(unique) else np.empty(0, dtype=np.int64)
+
+    def rating_of(self, player_id, surface=None):
+        """Current overall rating, or surface rating when `surface` is one of SURFACES."""
+        row = self.slot.get(player_id)
+        if row is None:
+            return INITIAL_RATING
+        code = SURFACE_CODES.get(surface, -1)
+        return float(self.rating[row] if code < 0 else self.surface_rating[row, code])
+
+    def win_probability(self, player_id, opponent_id, surface=None):
+        """Elo win probability of player against opponent (surface ratings when `surface` is given)."""
+        return expected_score(self.rating_of(player_id, surface), self.rating_of(opponent_id, surface))
+
+    def update(self, winner, loser, surface=None):
+        """
+        Fold one result in. Returns the pre-match (winner_elo, loser_elo,
+        winner_surface_elo, loser_surface_elo); surface ratings are the overall
+        ones when the surface has no rating of its own.
+        """
+        w, l = self._slot(winner), self._slot(loser)
+        pre = [self.rating[w], self.rating[l]]
+        gain = 1 - expected_score(pre[0], pre[1])
+        self.rating[w] += k_factor(self.matches[w]) * gain
+        self.rating[l] -= k_factor(self.matches[l]) * gain
+        self.matches[w] += 1
+        self.matches[l] += 1
+
+        code = SURFACE_CODES.get(surface, -1)
+        if code < 0:
+            return tuple(float(r) for r in pre + pre)
+        pre += [self.surface_rating[w, code], self.surface_rating[l, code]]
+        gain = 1 - expected_score(pre[2], pre[3])
+        self.surface_rating[w, code] += k_factor(self.surface_matches[w, code]) * gain
+        self.surface_rating[l, code] -= k_factor(self.surface_matches[l, code]) * gain
+        self.surface_matches[w, code] += 1
+        self.surface_matches[l, code] += 1
+        return tuple(float(r) for r in pre)
+
+    def update_frame(self, df, order=None, surface_col='surface'):
+        """
+        Fold every match of df in, in match order (see chronological_order), in one
+        pass. Returns the pre-match ratings as a frame with ELO_COLUMNS aligned with
+        df.index.
+
+        The pass runs over plain lists of the array state (written back at the end)
+        with a precomputed K factor table, the per-match work being a handful of
+        float operations.
+        """
+        n = len(df)
+        if order is None:
+            order = chronological_order(df)
+        winners = self._slots(df['winner_id'].to_numpy()[order]).tolist()
+        losers = self._slots(df['loser_id'].to_numpy()[order]).tolist()
+        if surface_col in df:
+            surfaces = pd.Categorical(df[surface_col].astype(object), categories=SURFACES).codes[order].tolist()
+        else:
+            surfaces = [-1] * n
+
+        size = len(self.slot)
+        rating, matches = self.rating[:size].tolist(), self.matches[:size].tolist()
+        surface_rating = self.surface_rating[:size].tolist()
+        surface_matches = self.surface_matches[:size].tolist()
+        most = max(int(self.matches[:size].max(initial=0)), int(self.surface_matches[:size].max(initial=0)))
+        k = k_factor(np.arange(most + n + 1)).tolist()
+
+        pre = np.empty((n, 4))
+        rows = pre.tolist()
+        for i, (w, l, s) in enumerate(zip(winners, losers, surfaces)):
+            rw, rl = rating[w], rating[l]
+            gain = 1 - 1 / (1 + 10 ** ((rl - rw) / 400))
+            rating[w] = rw + k[matches[w]] * gain
+            rating[l] = rl - k[matches[l]] * gain
+            matches[w] += 1
+            matches[l] += 1
+            if s < 0:
+                rows[i] = (rw, rl, rw, rl)
+                continue
+            sw, sl = surface_rating[w], surface_rating[l]
+            rsw, rsl = sw[s], sl[s]
+            gain = 1 - 1 / (1 + 10 ** ((rsl - rsw) / 400))
+            sw[s] = rsw + k[surface_matches[w][s]] * gain
+            sl[s] = rsl - k[surface_matches[l][s]] * gain
+            surface_matches[w][s] += 1
+            surface_matches[l][s] += 1
+            rows[i] = (rw, rl, rsw, rsl)
+
+        self.rating[:size], self.matches[:size] = rating, matches
+        if size:
+            self.surface_rating[:size], self.surface_matches[:size] = surface_rating, surface_matches
+        if n:
+            pre[np.asarray(order)] = rows
+        return pd.DataFrame(pre, columns=ELO_COLUMNS, index=df.index)
+
+    @classmethod
+    def from_matches(cls, df, order=None):
+        ratings = cls()
+        ratings.update_frame(df, order)
+        return ratings
+
+
+# ----------------------------------------------------------
+# Ratings saved next to a feature dataset
+# ----------------------------------------------------------
+def ratings_path(data_path):
+    """feature_dataset_light.csv -> feature_dataset_light.elo.pkl"""
+    return os.path.splitext(data_path)[0] + '.elo.pkl'
+
+
+def save_ratings(ratings, data_path, data_sha256):
+    """Save the ratings after every match of the csv at data_path (sha256 data_sha256)."""
+    with open(ratings_path(data_path), 'wb') as f:
+        pickle.dump({'data_sha256': data_sha256, 'ratings': ratings}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_ratings(data_path, data_sha256):
+    """The ratings saved for this version of the csv, None if missing or saved for another version."""
+    path = ratings_path(data_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        saved = pickle.load(f)
+    return saved['ratings'] if saved.get('data_sha256') == data_sha256 else None
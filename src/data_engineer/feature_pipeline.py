@@ -0,0 +1,277 @@
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+from src.data_engineer.elo import EloRatings, save_ratings
+from src.data_engineer.form import FORM_WINDOWS, form_columns, last_results
+from src.data_engineer.h2h import h2h_counts, h2h_winrate
+from src.data_engineer.incremental import incremental_build
+from src.data_engineer.ingest import chronological_chunks, read_matches
+from src.data_engineer.match_order import add_match_id, chronological_order
+from src.data_engineer.match_store import BASE_DIR, DATA_DIR, concat_matches
+
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+CHECKPOINT_NAME = 'feature_pipeline'
+
+# ----------------------------------------------------------
+# ✂️ Output projections
+# ----------------------------------------------------------
+LIGHT_COLUMNS = [
+    'tourney_id', 'tourney_date', 'tourney_name', 'surface', 'round', 'match_num', 'score',
+    'winner_id', 'loser_id', 'winner_name', 'loser_name',
+    'winner_rank', 'winner_rank_points', 'loser_rank', 'loser_rank_points',
+    'winner_age', 'loser_age', 'winner_ht', 'loser_ht',
+    'winner_hand', 'loser_hand',
+    'ranking_diff', 'rank_points_diff', 'age_diff', 'height_diff',
+    'same_hand', 'hand_matchup',
+    'h2h_winrate', 'winner_recent_winrate', 'loser_recent_winrate',
+    'winner_elo', 'loser_elo', 'winner_surface_elo', 'loser_surface_elo',
+    'elo_diff', 'surface_elo_diff'
+]
+
+# projection name -> columns kept (None keeps every column)
+PROJECTIONS = {
+    'full': None,
+    'light': LIGHT_COLUMNS,
+}
+
+OUTPUT_FILES = {
+    'full': 'feature_dataset.csv',
+    'light': 'feature_dataset_light.csv',
+}
+
+# raw rows per chunk of the chunked build (whole yearly files are kept together)
+CHUNK_ROWS = 200_000
+
+
+@contextmanager
+def stage(name, timings):
+    start = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - start
+
+
+# ----------------------------------------------------------
+# Stages
+# ----------------------------------------------------------
+def load(data_folder=DATA_DIR, workers=None):
+    """Read every yearly match file (in year order, parsed in parallel) into one frame with compact dtypes."""
+    return concat_matches(read_matches(data_folder, workers=workers))
+
+
+def clean(df):
+    # Drop rows missing essential information
+    df = df.dropna(subset=['winner_name', 'loser_name', 'winner_rank', 'loser_rank']).copy()
+
+    # Convert date
+    df['tourney_date'] = pd.to_datetime(df['tourney_date'], format='%Y%m%d', errors='coerce')
+    df = df.dropna(subset=['tourney_date'])
+
+    # One stable key per match, used to attach per-player features without merge fan-out
+    return add_match_id(df)
+
+
+def add_diffs(df):
+    df['ranking_diff'] = df['loser_rank'] - df['winner_rank']
+    df['rank_points_diff'] = df['winner_rank_points'] - df['loser_rank_points']
+    df['age_diff'] = df['winner_age'] - df['loser_age']
+    df['height_diff'] = df['winner_ht'] - df['loser_ht']
+    df['same_hand'] = (df['winner_hand'] == df['loser_hand']).astype(int)
+    hands = [df[col].astype(object).fillna('U') for col in ('winner_hand', 'loser_hand')]
+    df['hand_matchup'] = (hands[0] + '_' + hands[1]).astype('category')
+    df['label'] = 1  # will be used later
+    return df
+
+
+def add_h2h(df, order=None, prior=None):
+    # Pre-match h2h winrate from the winner's point of view, 0.5 for a first meeting
+    df['h2h_winrate'] = h2h_winrate(df, order=order, prior=prior)
+    return df
+
+
+def add_form(df, order=None, window=5, history=None):
+    # Winrate over the previous `window` matches (recent_winrate), plus the form over the
+    # previous FORM_WINDOWS matches and 52 weeks, overall / per surface / per tournament
+    # level (e.g. winner_surface_form_10); 0.5 without previous matches
+    for column, values in form_columns(df, window, order, history).items():
+        df[column] = values
+    return df
+
+
+def add_elo(df, order=None, ratings=None):
+    # Pre-match overall / surface Elo of both players; `ratings` (EloRatings) is
+    # updated with every match of df, so it can be carried to the next chunk
+    ratings = EloRatings() if ratings is None else ratings
+    pre = ratings.update_frame(df, order)
+    for column in pre:
+        df[column] = pre[column]
+    df['elo_diff'] = df['winner_elo'] - df['loser_elo']
+    df['surface_elo_diff'] = df['winner_surface_elo'] - df['loser_surface_elo']
+    return df
+
+
+def project(df, name):
+    columns = PROJECTIONS[name]
+    return df if columns is None else df[columns]
+
+
+def prepare(raw):
+    """Row-local stages only (clean + diffs), used for incremental appends."""
+    return add_diffs(clean(raw))
+
+
+def build_features(raw, timings=None):
+    """Run clean -> diffs -> h2h -> form -> elo once over the raw matches."""
+    timings = {} if timings is None else timings
+    rows_raw = len(raw)
+
+    with stage('clean', timings):
+        df = clean(raw)
+    rows_in = len(df)
+    with stage('diffs', timings):
+        df = add_diffs(df)
+    with stage('order', timings):
+        # tourney_date, tournament, round, match_num
+        order = chronological_order(df)
+    with stage('h2h', timings):
+        df = add_h2h(df, order)
+    with stage('form', timings):
+        df = add_form(df, order)
+    with stage('elo', timings):
+        df = add_elo(df, order)
+
+    print(f"ℹ️ Rows: {rows_raw} raw -> {rows_in} after cleaning -> {len(df)} with features")
+    if len(df) != rows_in:
+        raise RuntimeError(f"Feature build changed the number of matches ({rows_in} -> {len(df)})")
+    return df
+
+
+def run(projections=('light', 'full'), data_folder=DATA_DIR, output_dir=OUTPUT_DIR, incremental=False):
+    """
+    Build the features once and write every requested projection to output_dir.
+    Returns the per-stage timings in seconds.
+    """
+    unknown = [p for p in projections if p not in PROJECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown projections: {unknown} (available: {list(PROJECTIONS)})")
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {
+        name: (os.path.join(output_dir, output_name(name)),
+               lambda df, name=name: project(df, name))
+        for name in projections
+    }
+    # one checkpoint per set of projections, so each set stays consistent with its state
+    checkpoint = os.path.join(output_dir, '_'.join([CHECKPOINT_NAME] + sorted(projections)))
+
+    timings = {}
+    with stage('total', timings):
+        incremental_build(
+            data_folder, outputs,
+            build_features=lambda raw: build_features(raw, timings),
+            prepare=prepare,
+            checkpoint=checkpoint,
+            incremental=incremental,
+        )
+
+    for name, seconds in timings.items():
+        print(f"⏱️ {name:<6} {seconds:.3f}s")
+    return timings
+
+
+def output_name(name):
+    return OUTPUT_FILES.get(name, f'feature_dataset_{name}.csv')
+
+
+def run_chunked(projections=('light', 'full'), data_folder=DATA_DIR, output_dir=OUTPUT_DIR,
+                chunk_rows=CHUNK_ROWS, workers=None, window=5):
+    """
+    Out-of-core build: the yearly files are read in chronological chunks of about
+    `chunk_rows` rows and each chunk is featurized with the h2h counts and the last
+    results of every player the form windows need carried over from the previous chunks, then
+    written as one partition per projection (the Elo ratings are carried as well):
+
+        output_dir/<output name>/part-00000.csv, part-00001.csv, ...
+
+    Only one chunk (plus the per-pair / per-player state) is in memory at a time.
+    The partitions concatenated in order are identical to the in-memory build's csv,
+    so the final Elo ratings are saved keyed by that csv's sha256 (elo.save_ratings).
+    Returns the per-stage timings in seconds.
+    """
+    unknown = [p for p in projections if p not in PROJECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown projections: {unknown} (available: {list(PROJECTIONS)})")
+
+    folders = {name: os.path.join(output_dir, os.path.splitext(output_name(name))[0]) for name in projections}
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+        # partitions of an earlier run with other chunk boundaries
+        for path in glob.glob(os.path.join(folder, 'part-*.csv')):
+            os.remove(path)
+
+    timings = {}
+    h2h, form, elo = None, None, EloRatings()
+    # sha256 of each projection's partitions concatenated (header once), i.e. of its csv
+    digests = {name: hashlib.sha256() for name in projections}
+    rows_raw = rows_out = chunks = 0
+    with stage('total', timings):
+        for i, raw in enumerate(chronological_chunks(read_matches(data_folder, workers=workers), chunk_rows)):
+            rows_raw += len(raw)
+            df = prepare(raw)
+            order = chronological_order(df)
+            df = add_form(add_h2h(df, order, prior=h2h), order, window, history=form)
+            df = add_elo(df, order, ratings=elo)
+            h2h = h2h_counts(df, prior=h2h)
+            form = last_results(df, (window,) + FORM_WINDOWS, order, history=form)
+
+            for name, folder in folders.items():
+                text = project(df, name).to_csv(index=False)
+                with open(os.path.join(folder, f'part-{i:05d}.csv'), 'w', encoding='utf-8') as f:
+                    f.write(text)
+                digests[name].update((text if i == 0 else text.split('\n', 1)[1]).encode('utf-8'))
+            rows_out += len(df)
+            chunks += 1
+            print(f"✅ Chunk {i}: {len(raw)} raw -> {len(df)} rows ({len(h2h)} pairs, {len(form)} form rows carried)")
+
+    for name, folder in folders.items():
+        save_ratings(elo, os.path.join(output_dir, output_name(name)), digests[name].hexdigest())
+
+    print(f"ℹ️ Rows: {rows_raw} raw -> {rows_out} with features in {chunks} chunks -> {sorted(folders.values())}")
+    for name, seconds in timings.items():
+        print(f"⏱️ {name:<6} {seconds:.3f}s")
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the match feature datasets")
+    parser.add_argument('--projection', action='append', choices=sorted(PROJECTIONS),
+                        help="projection to write (repeatable, default: light and full)")
+    parser.add_argument('--data-folder', default=DATA_DIR)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--incremental', action='store_true',
+                        help="only process matches from changed input files (uses the saved checkpoint)")
+    parser.add_argument('--chunk-rows', type=int,
+                        help="out-of-core build: featurize about this many rows at a time and write "
+                             "partitioned output (see run_chunked)")
+    parser.add_argument('--workers', type=int, help="chunked build: files parsed in parallel (default: one per core)")
+    args = parser.parse_args(argv)
+    projections = args.projection or ['light', 'full']
+
+    if args.chunk_rows:
+        if args.incremental:
+            parser.error("--incremental and --chunk-rows cannot be combined")
+        run_chunked(projections, args.data_folder, args.output_dir, args.chunk_rows, args.workers)
+    else:
+        run(projections, args.data_folder, args.output_dir, args.incremental)
+
+
+if __name__ == '__main__':
+    main()
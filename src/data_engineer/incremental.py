@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import pickle
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineer.elo import ELO_COLUMNS, EloRatings, save_ratings
+from src.data_engineer.form import FORM_WINDOWS, form_columns, last_results
+from src.data_engineer.match_order import chronological_order
+from src.data_engineer.ingest import match_files, read_files
+from src.data_engineer.match_store import concat_matches
+
+MANIFEST_VERSION = 4   # 2: compact dtypes, state keyed by player id; 3: Elo ratings; 4: multi-window form
+
+
+# ----------------------------------------------------------
+# Manifest of the yearly input files
+# ----------------------------------------------------------
+def file_fingerprint(path, previous=None):
+    """sha256 + mtime + size of one input file (hash reused if mtime/size are unchanged)."""
+    stat = os.stat(path)
+    if previous and previous.get('mtime') == stat.st_mtime and previous.get('size') == stat.st_size:
+        return dict(previous)
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return {'sha256': h.hexdigest(), 'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def scan_inputs(data_folder, previous=None):
+    previous = previous or {}
+    return {
+        os.path.basename(path): file_fingerprint(path, previous.get(os.path.basename(path)))
+        for path in match_files(data_folder)
+    }
+
+
+def rows_digest(df):
+    """Digest of the parsed rows of one input file, used to detect edits to already processed rows."""
+    hashed = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def manifest_path(checkpoint):
+    return checkpoint + '.manifest.json'
+
+
+def state_path(checkpoint):
+    return checkpoint + '.state.pkl'
+
+
+def load_manifest(checkpoint):
+    path = manifest_path(checkpoint)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+
+def save_manifest(checkpoint, inputs, rows):
+    """rows: output name -> {'rows': rows written, 'size': file size after writing}."""
+    manifest = {'version': MANIFEST_VERSION, 'inputs': inputs, 'outputs': rows}
+    with open(manifest_path(checkpoint), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+# ----------------------------------------------------------
+# Per-player / per-pair state checkpoint
+# ----------------------------------------------------------
+class FeatureState:
+    """
+    Running state needed to compute h2h_winrate, the form columns and the Elo ratings
+    for the next match without looking at the full history again.
+    """
+
+    def __init__(self, window=5):
+        self.window = window
+        self.form = {}            # player id -> last `window` results (1 = win)
+        self.h2h = {}             # (p1, p2) ids with p1 < p2 -> [matches, p1_wins]
+        self.seen = set()         # match_id of the matches already written to the output
+        self.last_date = None
+        self.elo = EloRatings()   # overall / surface Elo of every player
+        self.history = None       # results the multi-window form still reads (see form.last_results)
+
+    def recent_winrate(self, player):
+        results = self.form.get(player)
+        if not results:
+            return None
+        return sum(results) / len(results)
+
+    def h2h_winrate(self, player, opponent):
+        p1, p2 = min(player, opponent), max(player, opponent)
+        record = self.h2h.get((p1, p2))
+        if record is None:
+            return None
+        p1_winrate = record[1] / record[0]
+        return p1_winrate if player == p1 else 1 - p1_winrate
+
+    def update(self, winner, loser, date=None, key=None, surface=None):
+        """Fold one result in; returns the pre-match Elo ratings (see EloRatings.update)."""
+        self._record(winner, loser, date, key)
+        return self.elo.update(winner, loser, surface)
+
+    def _record(self, winner, loser, date=None, key=None):
+        for player, win in ((winner, 1), (loser, 0)):
+            if player not in self.form:
+                self.form[player] = deque(maxlen=self.window)
+            self.form[player].append(win)
+
+        p1, p2 = min(winner, loser), max(winner, loser)
+        record = self.h2h.setdefault((p1, p2), [0, 0])
+        record[0] += 1
+        record[1] += int(winner == p1)
+
+        if key is not None:
+            self.seen.add(key)
+        if date is not None and (self.last_date is None or date > self.last_date):
+            self.last_date = date
+
+    def add_features(self, df):
+        """
+        Compute the pre-match h2h winrates, form columns and Elo ratings for new matches
+        (in chronological order) and fold each result into the state. The form columns
+        are computed for the whole batch at once against the carried history.
+        """
+        df = df.iloc[chronological_order(df)].copy()
+        order = np.arange(len(df))
+        h2h, elo = [], []
+        for row in df[['winner_id', 'loser_id', 'tourney_date', 'match_id', 'surface']].itertuples(index=False):
+            h2h.append(self.h2h_winrate(row.winner_id, row.loser_id))
+            elo.append(self.update(row.winner_id, row.loser_id, row.tourney_date, row.match_id, row.surface))
+
+        df['h2h_winrate'] = pd.Series(h2h, index=df.index, dtype='float64').fillna(0.5)
+        for column, values in form_columns(df, self.window, order, self.history).items():
+            df[column] = values
+        self.history = last_results(df, (self.window,) + FORM_WINDOWS, order, self.history)
+        df[ELO_COLUMNS] = np.array(elo, dtype='float64').reshape(-1, len(ELO_COLUMNS))
+        df['elo_diff'] = df['winner_elo'] - df['loser_elo']
+        df['surface_elo_diff'] = df['winner_surface_elo'] - df['loser_surface_elo']
+        return df
+
+    @classmethod
+    def from_matches(cls, df, window=5):
+        state = cls(window)
+        df = df.iloc[chronological_order(df)]
+        # the Elo pass is batched, the counters are folded in match by match
+        state.elo.update_frame(df, order=np.arange(len(df)))
+        state.history = last_results(df, (window,) + FORM_WINDOWS, order=np.arange(len(df)))
+        for row in df[['winner_id', 'loser_id', 'tourney_date', 'match_id']].itertuples(index=False):
+            state._record(row.winner_id, row.loser_id, row.tourney_date, row.match_id)
+        return state
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+# ----------------------------------------------------------
+# Build driver
+# ----------------------------------------------------------
+def _read_inputs(data_folder, inputs, names):
+    frames = []
+    for path, raw in read_files([os.path.join(data_folder, f) for f in names]):
+        f = os.path.basename(path)
+        inputs[f]['rows'] = len(raw)
+        inputs[f]['rows_sha256'] = rows_digest(raw)
+        frames.append(raw)
+    return frames
+
+
+def _save_ratings(outputs, ratings):
+    # the final Elo ratings next to every output, so loading a dataset does not replay it
+    for path, _ in outputs.values():
+        save_ratings(ratings, path, file_fingerprint(path)['sha256'])
+
+
+def _full_build(data_folder, outputs, checkpoint, inputs, build_features):
+    frames = _read_inputs(data_folder, inputs, list(inputs))
+    df = build_features(concat_matches(frames))
+
+    rows = {}
+    for name, (path, project) in outputs.items():
+        out = project(df)
+        out.to_csv(path, index=False)
+        rows[name] = {'rows': len(out), 'size': os.path.getsize(path)}
+        print(f"✅ Full build: saved {len(out)} rows to {path}")
+    state = FeatureState.from_matches(df)
+    state.save(state_path(checkpoint))
+    _save_ratings(outputs, state.elo)
+    save_manifest(checkpoint, inputs, rows)
+    return df
+
+
+def incremental_build(data_folder, outputs, build_features, prepare, checkpoint, incremental=True):
+    """
+    Rebuild the feature outputs from the yearly csv files in `data_folder`.
+
+    outputs                -> output name -> (csv path, project(df) giving the columns written)
+    build_features(raw_df) -> the full feature frame (used for a full rebuild)
+    prepare(raw_df)        -> cleaned rows with the row-local features only
+    checkpoint             -> path prefix of the manifest / state files
+
+    With incremental=True only rows from changed input files that are not already in
+    the outputs are processed, using the saved state checkpoint, and appended.
+    A full rebuild happens when there is no usable manifest / checkpoint for the
+    requested outputs or when a change rewrites history instead of adding new matches.
+    Returns the newly featurized rows (None when nothing changed).
+    """
+    manifest = load_manifest(checkpoint)
+    previous = manifest['inputs'] if manifest else None
+    inputs = scan_inputs(data_folder, previous)
+
+    def full_build():
+        return _full_build(data_folder, outputs, checkpoint, inputs, build_features)
+
+    if not incremental or manifest is None or set(manifest['outputs']) != set(outputs) \
+            or not os.path.exists(state_path(checkpoint)) \
+            or not all(os.path.exists(path) for path, _ in outputs.values()):
+        return full_build()
+    for name, (path, _) in outputs.items():
+        # another build wrote this file since our checkpoint, appending would duplicate rows
+        if os.path.getsize(path) != manifest['outputs'][name]['size']:
+            print(f"⚠️ {path} was rewritten outside this checkpoint, doing a full rebuild")
+            return full_build()
+
+    removed = set(previous) - set(inputs)
+    changed = [f for f in inputs if previous.get(f, {}).get('sha256') != inputs[f]['sha256']]
+    if removed:
+        print(f"⚠️ Input files removed ({sorted(removed)}), doing a full rebuild")
+        return full_build()
+    if not changed:
+        save_manifest(checkpoint, inputs, manifest['outputs'])
+        print("✅ Feature outputs are up to date")
+        return None
+
+    frames = _read_inputs(data_folder, inputs, changed)
+    for f, raw in zip(changed, frames):
+        old = previous.get(f)
+        if old is None:
+            continue
+        # new matches are expected to be appended, the processed rows must be untouched
+        if len(raw) < old['rows'] or rows_digest(raw.iloc[:old['rows']]) != old['rows_sha256']:
+            print(f"⚠️ Already processed rows changed in {f}, doing a full rebuild")
+            return full_build()
+
+    state = FeatureState.load(state_path(checkpoint))
+    raw = concat_matches(frames)
+    new = prepare(raw)
+    new = new[~new['match_id'].isin(state.seen)]
+
+    if new.empty:
+        save_manifest(checkpoint, inputs, manifest['outputs'])
+        print(f"✅ No new matches in {changed}")
+        return None
+    if state.last_date is not None and new['tourney_date'].min() < state.last_date:
+        # a backdated / corrected match changes the history behind the checkpoint
+        print("⚠️ Changed files contain matches older than the checkpoint, doing a full rebuild")
+        return full_build()
+
+    new = state.add_features(new)
+    rows = {}
+    for name, (path, project) in outputs.items():
+        out = project(new)
+        columns = pd.read_csv(path, nrows=0).columns
+        out[columns].to_csv(path, mode='a', header=False, index=False)
+        rows[name] = {'rows': manifest['outputs'][name]['rows'] + len(out), 'size': os.path.getsize(path)}
+        print(f"✅ Incremental build: appended {len(out)} rows from {changed} to {path}")
+
+    state.save(state_path(checkpoint))
+    _save_ratings(outputs, state.elo)
+    save_manifest(checkpoint, inputs, rows)
+    return new
@@ -0,0 +1,117 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from src.data_engineer.match_store import DATA_DIR, SCHEMA, concat_matches, read_matches_csv
+
+# File name prefixes of the tours read by default; Challenger / Futures files
+# (atp_matches_qual_chall_<year>.csv, atp_matches_futures_<year>.csv) can be added
+TOURS = {
+    'atp': 'atp_matches_',
+}
+
+# Every file must have these columns; only these are parsed (explicit dtypes from
+# match_store.CSV_DTYPES), anything else in a file is ignored
+USECOLS = SCHEMA.names
+
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+def file_year(name, prefix):
+    """2024 for 'atp_matches_2024.csv', None if the name is not '<prefix><year>.csv'."""
+    stem = name[len(prefix):-len('.csv')]
+    if name.startswith(prefix) and name.endswith('.csv') and stem.isdigit():
+        return int(stem)
+    return None
+
+
+def match_files(data_folder=DATA_DIR, tours=('atp',)):
+    """Paths of the yearly match files of the given tours, oldest year first (tours in order)."""
+    found = []
+    for f in os.listdir(data_folder):
+        for rank, tour in enumerate(tours):
+            year = file_year(f, TOURS[tour])
+            if year is not None:
+                found.append((year, rank, os.path.join(data_folder, f)))
+    return [path for _, _, path in sorted(found)]
+
+
+def check_columns(paths, usecols=USECOLS):
+    """
+    Compare the headers of every file before parsing anything. Raises ValueError listing
+    the files missing one of `usecols`; columns outside `usecols` only get a warning.
+    """
+    missing, extra = {}, set()
+    for path in paths:
+        columns = pd.read_csv(path, nrows=0).columns
+        absent = [c for c in usecols if c not in columns]
+        if absent:
+            missing[os.path.basename(path)] = absent
+        extra.update(c for c in columns if c not in usecols)
+    if missing:
+        raise ValueError(f"Match files missing columns: {missing}")
+    if extra:
+        print(f"⚠️ Ignoring columns not in the schema: {sorted(extra)}")
+
+
+def _read(path, usecols):
+    return read_matches_csv(path, usecols=usecols)
+
+
+def read_files(paths, usecols=USECOLS, workers=None, executor='thread'):
+    """
+    Parse the files on a pool of `workers` threads or processes and yield (path, frame)
+    in the order of `paths`, as soon as each is ready. At most 2 * workers frames are
+    parsed ahead of the consumer, so memory stays bounded by the files in flight
+    instead of the whole dataset. workers=1 parses in the calling thread.
+    """
+    paths = list(paths)
+    check_columns(paths, usecols)
+    workers = min(os.cpu_count() or 1, len(paths)) if workers is None else workers
+    if workers <= 1:
+        for path in paths:
+            yield path, _read(path, usecols)
+        return
+
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append((path, pool.submit(_read, path, usecols)))
+            if len(pending) >= 2 * workers:
+                done_path, future = pending.popleft()
+                yield done_path, future.result()
+        while pending:
+            done_path, future = pending.popleft()
+            yield done_path, future.result()
+
+
+def read_matches(data_folder=DATA_DIR, tours=('atp',), usecols=USECOLS, workers=None, executor='thread'):
+    """Frames of every yearly match file (see read_files), oldest first."""
+    for _, df in read_files(match_files(data_folder, tours), usecols, workers, executor):
+        yield df
+
+
+def chronological_chunks(frames, chunk_rows):
+    """
+    Group consecutive frames into chunks of at least `chunk_rows` rows, whole frames
+    only. A chunk is only closed when the next frame starts after its last
+    tourney_date, so every match of a chunk comes before every match of the next
+    one (overlapping files, e.g. two tours of the same year, share a chunk).
+    """
+    pending, rows, last_date = [], 0, None
+    for df in frames:
+        if not len(df):
+            continue
+        if pending and rows >= chunk_rows and df['tourney_date'].min() > last_date:
+            yield concat_matches(pending)
+            pending, rows, last_date = [], 0, None
+        pending.append(df)
+        rows += len(df)
+        last_date = df['tourney_date'].max() if last_date is None else max(last_date, df['tourney_date'].max())
+    if pending:
+        yield concat_matches(pending)
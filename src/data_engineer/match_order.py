@@ -0,0 +1,34 @@
+import numpy as np
+
+# Order of the rounds inside one tournament (all matches share the same tourney_date)
+ROUND_ORDER = {
+    'Q1': 0, 'Q2': 1, 'Q3': 2, 'ER': 3,
+    'R128': 4, 'R64': 5, 'R32': 6, 'R16': 7, 'RR': 8,
+    'QF': 9, 'SF': 10, 'BR': 11, 'F': 12,
+}
+
+
+def add_match_id(df):
+    """Stable per-match key: tourney_id + match_num (e.g. '2024-0339-300')."""
+    df['match_id'] = df['tourney_id'].astype(str) + '-' + df['match_num'].astype(str)
+    duplicated = df['match_id'].duplicated()
+    if duplicated.any():
+        raise ValueError(f"Duplicate match ids: {df.loc[duplicated, 'match_id'].head().tolist()}")
+    return df
+
+
+def round_order(df):
+    return df['round'].astype(object).map(ROUND_ORDER).fillna(len(ROUND_ORDER)).to_numpy()
+
+
+def chronological_order(df):
+    """
+    Positions of df's rows in match order: tourney_date, then tournament,
+    then round inside the tournament, then match_num.
+    """
+    return np.lexsort((
+        df['match_num'].to_numpy(),
+        round_order(df),
+        df['tourney_id'].astype(str).to_numpy(),
+        df['tourney_date'].to_numpy(),
+    ))
@@ -0,0 +1,228 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+
+DATA_DIR = os.path.join(ROOT_DIR, 'data', 'atp1_2000-2024')
+STORE_DIR = os.path.join(BASE_DIR, 'output', 'match_store')
+
+# ----------------------------------------------------------
+# Fixed schema of the match store
+# ----------------------------------------------------------
+# Names and other repeated strings are dictionary encoded (categorical in
+# pandas), ranks / ids / dates are int32 and ages / heights are float32.
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema([
+    ('tourney_id', CATEGORY),
+    ('tourney_name', CATEGORY),
+    ('surface', CATEGORY),
+    ('draw_size', pa.int16()),
+    ('tourney_level', CATEGORY),
+    ('tourney_date', pa.int32()),
+    ('match_num', pa.int32()),
+    ('winner_id', pa.int32()),
+    ('winner_seed', pa.int16()),
+    ('winner_entry', CATEGORY),
+    ('winner_name', CATEGORY),
+    ('winner_hand', CATEGORY),
+    ('winner_ht', pa.float32()),
+    ('winner_ioc', CATEGORY),
+    ('winner_age', pa.float32()),
+    ('loser_id', pa.int32()),
+    ('loser_seed', pa.int16()),
+    ('loser_entry', CATEGORY),
+    ('loser_name', CATEGORY),
+    ('loser_hand', CATEGORY),
+    ('loser_ht', pa.float32()),
+    ('loser_ioc', CATEGORY),
+    ('loser_age', pa.float32()),
+    ('score', pa.string()),
+    ('best_of', pa.int16()),
+    ('round', CATEGORY),
+    ('minutes', pa.int16()),
+    ('w_ace', pa.int16()),
+    ('w_df', pa.int16()),
+    ('w_svpt', pa.int16()),
+    ('w_1stIn', pa.int16()),
+    ('w_1stWon', pa.int16()),
+    ('w_2ndWon', pa.int16()),
+    ('w_SvGms', pa.int16()),
+    ('w_bpSaved', pa.int16()),
+    ('w_bpFaced', pa.int16()),
+    ('l_ace', pa.int16()),
+    ('l_df', pa.int16()),
+    ('l_svpt', pa.int16()),
+    ('l_1stIn', pa.int16()),
+    ('l_1stWon', pa.int16()),
+    ('l_2ndWon', pa.int16()),
+    ('l_SvGms', pa.int16()),
+    ('l_bpSaved', pa.int16()),
+    ('l_bpFaced', pa.int16()),
+    ('winner_rank', pa.int32()),
+    ('winner_rank_points', pa.int32()),
+    ('loser_rank', pa.int32()),
+    ('loser_rank_points', pa.int32()),
+])
+
+# Columns that never contain nulls come back as plain numpy ints,
+# everything else keeps its nulls through pandas nullable dtypes.
+REQUIRED_COLUMNS = ['tourney_date', 'match_num', 'winner_id', 'loser_id', 'draw_size', 'best_of']
+
+_PANDAS_TYPES = {
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+}
+
+# Ages stay float64 when reading the csv files: age_diff is a model feature and
+# float32 ages would change its values. Heights are whole centimetres, exact in float32.
+FLOAT64_COLUMNS = ['winner_age', 'loser_age']
+
+# dtypes of the columns read from the csv files, the same compact columns as the store
+CSV_DTYPES = {
+    field.name: ('category' if pa.types.is_dictionary(field.type)
+                 else field.type.to_pandas_dtype() if field.name in REQUIRED_COLUMNS
+                 else _PANDAS_TYPES.get(field.type, field.type.to_pandas_dtype()))
+    for field in SCHEMA if not pa.types.is_string(field.type)
+}
+CSV_DTYPES.update({col: 'float64' for col in FLOAT64_COLUMNS})
+
+# nullable ints are parsed as float and converted after, read_csv is much slower at it
+_NULLABLE_COLUMNS = {col: dtype for col, dtype in CSV_DTYPES.items() if dtype in _PANDAS_TYPES.values()}
+_READ_DTYPES = {col: dtype for col, dtype in CSV_DTYPES.items() if col not in _NULLABLE_COLUMNS}
+
+
+def year_path(year, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f'atp_matches_{year}.arrow')
+
+
+def store_years(store_dir=STORE_DIR):
+    """Years currently available in the store, oldest first."""
+    if not os.path.isdir(store_dir):
+        return []
+    years = []
+    for f in os.listdir(store_dir):
+        if f.startswith('atp_matches_') and f.endswith('.arrow'):
+            years.append(int(f[len('atp_matches_'):-len('.arrow')]))
+    return sorted(years)
+
+
+def frame_to_table(df):
+    """A frame from read_matches_csv as an Arrow table in the fixed store schema."""
+    return pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+
+
+def csv_to_table(csv_path):
+    """Parse one yearly csv straight into the fixed store schema."""
+    return frame_to_table(read_matches_csv(csv_path))
+
+
+def _paired(col):
+    """winner_<x> and loser_<x> share their categories, so they can be compared with ==."""
+    return 'winner_' + col[len('loser_'):] if col.startswith('loser_') else col
+
+
+def unify_categories(frames):
+    """
+    Give every categorical column one set of categories across all frames (and across
+    winner_<x> / loser_<x>), so concatenating the frames keeps the columns categorical.
+    """
+    frames = list(frames)
+    groups = {}
+    for df in frames:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                groups.setdefault(_paired(col), set()).add(col)
+
+    dtypes = {}
+    for cols in groups.values():
+        categories = [df[col].cat.categories for df in frames for col in cols if col in df]
+        dtype = pd.CategoricalDtype(categories[0].append(categories[1:]).unique().sort_values())
+        dtypes.update({col: dtype for col in cols})
+    return [df.astype({col: dtype for col, dtype in dtypes.items() if col in df}) for df in frames]
+
+
+def concat_matches(frames):
+    """pd.concat of match frames that keeps categorical columns categorical."""
+    return pd.concat(unify_categories(frames), ignore_index=True)
+
+
+def _nullable_int(values, dtype):
+    """float column (NaN for missing) -> nullable integer array, without pandas' slow checked cast."""
+    values = np.asarray(values, dtype='float64')
+    missing = np.isnan(values)
+    return pd.arrays.IntegerArray(np.rint(np.where(missing, 0, values)).astype(dtype.numpy_dtype), missing)
+
+
+def read_matches_csv(csv_path, usecols=None):
+    """
+    Read one yearly csv with compact dtypes: int32 ids / dates, nullable int16 / int32
+    stats, categorical names, hands, countries and rounds (see CSV_DTYPES).
+    Combine the yearly frames with concat_matches, which also gives winner_<x> and
+    loser_<x> the same categories.
+    """
+    df = pd.read_csv(csv_path, dtype=_READ_DTYPES, usecols=usecols)
+    for col, dtype in _NULLABLE_COLUMNS.items():
+        if col in df.columns:
+            df[col] = _nullable_int(df[col], dtype)
+    return df
+
+
+def build_match_store(data_folder=DATA_DIR, store_dir=STORE_DIR, workers=None):
+    """
+    Convert every yearly csv into one uncompressed Arrow IPC file per year. The files
+    are parsed in parallel (ingest.read_files) and each is written as soon as it is
+    parsed, so the whole dataset is never held in memory at once.
+    """
+    from src.data_engineer.ingest import TOURS, file_year, match_files, read_files
+
+    os.makedirs(store_dir, exist_ok=True)
+    written = []
+    for path, df in read_files(match_files(data_folder), workers=workers):
+        year = file_year(os.path.basename(path), TOURS['atp'])
+        # uncompressed so that reads can be memory mapped without decoding
+        feather.write_feather(frame_to_table(df), year_path(year, store_dir), compression='uncompressed')
+        written.append(year)
+    return written
+
+
+def load_table(columns=None, years=None, store_dir=STORE_DIR):
+    """Read the requested columns of the requested years as one Arrow table."""
+    available = store_years(store_dir)
+    if not available:
+        raise FileNotFoundError(
+            f"Match store not found in {store_dir}, run src/data_engineer/build_playerdataset.py first"
+        )
+    if years is None:
+        years = available
+    missing = sorted(set(years) - set(available))
+    if missing:
+        raise ValueError(f"Years not in match store: {missing}")
+    if columns is not None:
+        unknown = [c for c in columns if c not in SCHEMA.names]
+        if unknown:
+            raise ValueError(f"Unknown match store columns: {unknown}")
+        columns = list(columns)
+
+    tables = [
+        feather.read_table(year_path(year, store_dir), columns=columns, memory_map=True)
+        for year in sorted(years)
+    ]
+    return pa.concat_tables(tables)
+
+
+def load_matches(columns=None, years=None, store_dir=STORE_DIR):
+    """
+    Load matches from the store as a pandas DataFrame.
+    Only the given columns / years are read from disk.
+    """
+    table = load_table(columns, years, store_dir)
+    df = table.to_pandas(types_mapper=_PANDAS_TYPES.get)
+    for col in REQUIRED_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(SCHEMA.field(col).type.to_pandas_dtype())
+    return unify_categories([df])[0]
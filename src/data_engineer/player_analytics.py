@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+RECENT_MATCHES = 20
+TOP_OPPONENTS = 5
+MIN_OPPONENT_MATCHES = 5
+
+
+class KeyedTable:
+    """
+    A frame sorted by `key` plus the row range of every key value, so the rows of
+    one key are a dict lookup and a slice, whatever the size of the table.
+    """
+
+    def __init__(self, frame, key):
+        frame = frame.sort_values(key, kind='stable').reset_index(drop=True)
+        values = frame[key].to_numpy()
+        keys, starts = np.unique(values, return_index=True)
+        stops = np.append(starts[1:], len(frame))
+        self.frame = frame.drop(columns=key)
+        self._rows = {k: (start, stop) for k, start, stop in zip(keys.tolist(), starts.tolist(), stops.tolist())}
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def get(self, key):
+        start, stop = self._rows.get(key, (0, 0))
+        return self.frame.iloc[start:stop]
+
+
+def player_matches_long(matches):
+    """
+    One row per (player, match): the match from the player's side, with 'player' and
+    'opponent' player ids, 'won' (1/0) and 'row' (position in `matches`).
+    """
+    n = len(matches)
+    winner = matches['winner_id'].to_numpy(np.int32)
+    loser = matches['loser_id'].to_numpy(np.int32)
+    long = pd.DataFrame({
+        'player': np.concatenate([winner, loser]),
+        'opponent': np.concatenate([loser, winner]),
+        'won': np.repeat(np.array([1, 0], dtype=np.int8), n),
+        'row': np.tile(np.arange(n, dtype=np.int32), 2),
+    })
+    for col in ('tourney_date', 'year', 'surface'):
+        if col in matches:
+            long[col] = np.tile(matches[col].to_numpy(), 2)
+    return long
+
+
+def _counts(long, by):
+    table = long.groupby(by, observed=True, sort=True)['won'].agg(['size', 'sum']).reset_index()
+    table = table.rename(columns={'size': 'matches', 'sum': 'wins'})
+    table[['matches', 'wins']] = table[['matches', 'wins']].astype(np.int32)
+    return table
+
+
+class PlayerTables:
+    """
+    Dashboard aggregates of every player, built at once with group-bys on player ids:
+
+    career:    matches, wins, winrate (%)
+    years:     per year matches, wins, winrate (%)
+    surfaces:  per surface wins (surfaces with at least one win)
+    opponents: per opponent Matches, Wins, Winrate (%), plus the top lists
+               most_played / toughest / easiest (min MIN_OPPONENT_MATCHES matches)
+    recent:    rows of `matches` of the last RECENT_MATCHES matches, wins first
+    names:     player id -> name in the match data (latest spelling), for display
+    ids:       name (any spelling in the match data) -> id of the last player using it
+    """
+
+    def __init__(self, matches):
+        long = player_matches_long(matches)
+        names = pd.DataFrame({
+            'player': long['player'].to_numpy(),
+            'name': np.concatenate([matches['winner_name'].astype(str).to_numpy(),
+                                    matches['loser_name'].astype(str).to_numpy()]),
+            'row': long['row'].to_numpy(),
+        }).sort_values('row', kind='stable')
+        latest = names.drop_duplicates('player', keep='last')
+        self.names = dict(zip(latest['player'].tolist(), latest['name'].tolist()))
+        latest = names.drop_duplicates('name', keep='last')
+        self.ids = dict(zip(latest['name'].tolist(), latest['player'].tolist()))
+
+        career = _counts(long, 'player')
+        career['winrate'] = (career['wins'] / career['matches'] * 100).round(2)
+        self.career = career.set_index('player')
+
+        years = _counts(long, ['player', 'year'])
+        years['winrate'] = years['wins'] / years['matches'] * 100
+        self.years = KeyedTable(years, 'player')
+
+        won = long[long['won'] == 1].dropna(subset=['surface'])
+        surfaces = won.groupby(['player', 'surface'], observed=True).size().rename('wins').reset_index()
+        # most won surface first, like value_counts
+        surfaces = surfaces.sort_values(['player', 'wins'], ascending=[True, False], kind='stable')
+        self.surfaces = KeyedTable(surfaces, 'player')
+
+        opponents = _counts(long, ['player', 'opponent'])
+        opponents['winrate'] = (opponents['wins'] / opponents['matches'] * 100).round(2)
+        opponents = opponents.rename(columns={'matches': 'Matches', 'wins': 'Wins', 'winrate': 'Winrate (%)'})
+        self.opponents = KeyedTable(opponents, 'player')
+        regular = opponents[opponents['Matches'] >= MIN_OPPONENT_MATCHES]
+        self.most_played = self._top(opponents, 'Matches', ascending=False)
+        self.toughest = self._top(regular, 'Winrate (%)', ascending=True)
+        self.easiest = self._top(regular, 'Winrate (%)', ascending=False)
+
+        recent = long.sort_values(['player', 'won', 'tourney_date'], ascending=[True, False, False], kind='stable')
+        self.recent_rows = KeyedTable(recent.groupby('player', sort=False).head(RECENT_MATCHES)[['player', 'row']], 'player')
+        self.matches = matches
+
+    @staticmethod
+    def _top(opponents, by, ascending):
+        ordered = opponents.sort_values(['player', by], ascending=[True, ascending], kind='stable')
+        return KeyedTable(ordered.groupby('player', sort=False).head(TOP_OPPONENTS), 'player')
+
+    def __contains__(self, player_id):
+        return player_id in self.career.index
+
+    def summary(self, player_id):
+        """(matches, wins, winrate %) over the player's career, zeros if unknown."""
+        if player_id not in self:
+            return 0, 0, 0
+        row = self.career.loc[player_id]
+        return int(row['matches']), int(row['wins']), float(row['winrate'])
+
+    def winrate_by_year(self, player_id):
+        years = self.years.get(player_id)
+        return pd.Series(years['winrate'].to_numpy(), index=years['year'].to_numpy(), name='winrate')
+
+    def surface_wins(self, player_id):
+        surfaces = self.surfaces.get(player_id)
+        return pd.Series(surfaces['wins'].to_numpy(), index=surfaces['surface'].astype(str).to_numpy(), name='wins')
+
+    def opponent_table(self, table, player_id):
+        """Rows of one of opponents / most_played / toughest / easiest, indexed by opponent name."""
+        rows = table.get(player_id)
+        return rows.drop(columns='opponent').set_axis(rows['opponent'].map(self.names).rename('opponent'))
+
+    def recent(self, player_id):
+        return self.matches.iloc[self.recent_rows.get(player_id)['row'].to_numpy()]
@@ -0,0 +1,248 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# score tiers, a match's score is its tier plus its trigram similarity (0-1)
+EXACT = 4.0
+PREFIX = 3.0
+SUBSTRING = 2.0
+MIN_SIMILARITY = 0.35
+
+# most entries scored per tier, so a query costs the same whatever the index size
+CANDIDATES = 500
+
+
+def normalize(name):
+    """Accent- and case-insensitive form of a name: 'Gaël  Monfils-X' -> 'gael monfils x'."""
+    name = str(name)
+    if not name.isascii():
+        name = unicodedata.normalize("NFKD", name)
+        name = "".join(c for c in name if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", name.casefold()).strip()
+
+
+def trigrams(text, pad=True):
+    text = f" {text} " if pad else text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PlayerSearchIndex:
+    """
+    Name search over players, resolving to player_id.
+
+    exact:    normalized name -> entries, for resolve() and exact hits
+    tokens:   sorted distinct name tokens; the entries of every token are stored
+              back to back, so the names with a token starting with a prefix are
+              one contiguous slice found by bisect
+    postings: trigram -> sorted entries, for substring and fuzzy (typo) matches
+
+    An entry is one (player_id, name) spelling; the same player can have several.
+    """
+
+    def __init__(self, names, player_ids, norms=None):
+        self.names = list(names)
+        self.player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.norms = [normalize(name) for name in self.names] if norms is None else list(norms)
+
+        self.exact = {}
+        for entry, norm in enumerate(self.norms):
+            self.exact.setdefault(norm, []).append(entry)
+
+        # (entry, token) and (entry, trigram) pairs, grouped by token / trigram with a
+        # stable sort so the entries of every group stay in ascending order
+        entry_tokens = [set(norm.split()) for norm in self.norms]
+        entry_grams = [trigrams(norm) for norm in self.norms]
+        token_entries, token_codes, self.tokens = self._group(entry_tokens, sort=True)
+        gram_entries, gram_codes, grams = self._group(entry_grams)
+
+        self._token_offsets = np.searchsorted(token_codes, np.arange(len(self.tokens) + 1)).astype(np.int64)
+        self._token_entries = token_entries
+        gram_offsets = np.searchsorted(gram_codes, np.arange(len(grams) + 1))
+        self.postings = {gram: gram_entries[gram_offsets[i]:gram_offsets[i + 1]] for i, gram in enumerate(grams)}
+
+        # the tokens of every entry (as positions in self.tokens), stored back to back
+        token_ids = {token: i for i, token in enumerate(self.tokens)}
+        counts = [len(tokens) for tokens in entry_tokens]
+        self._entry_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._entry_tokens = np.array([token_ids[t] for tokens in entry_tokens for t in tokens], dtype=np.int32)
+        self._trigram_counts = np.array([len(g) for g in entry_grams], dtype=np.int32)
+        self._name_lengths = np.array([len(norm) for norm in self.norms], dtype=np.int32)
+
+    @staticmethod
+    def _group(keys_per_entry, sort=False):
+        """(entries, key codes) ordered by key, and the distinct keys."""
+        counts = [len(keys) for keys in keys_per_entry]
+        entries = np.repeat(np.arange(len(keys_per_entry), dtype=np.int32), counts)
+        codes, uniques = pd.factorize(pd.Series([k for keys in keys_per_entry for k in keys], dtype=object), sort=sort)
+        order = np.argsort(codes, kind="stable")
+        return entries[order], codes[order], list(uniques)
+
+    @classmethod
+    def from_frames(cls, players, matches=None):
+        """
+        players: atp_players.csv (player_id, name_first, name_last)
+        matches: optional frame with winner_id / winner_name / loser_id / loser_name;
+                 names spelled as in the match data come first, so resolve()
+                 prefers the player who actually played under that name
+        """
+        parts = []
+        if matches is not None:
+            for side in ("winner", "loser"):
+                parts.append(pd.DataFrame({
+                    "player_id": matches[f"{side}_id"].to_numpy(),
+                    "name": matches[f"{side}_name"].astype(str).to_numpy(),
+                }))
+        full_names = (players["name_first"].fillna("") + " " + players["name_last"].fillna("")).str.strip()
+        parts.append(pd.DataFrame({"player_id": players["player_id"].to_numpy(), "name": full_names.to_numpy()}))
+
+        entries = pd.concat(parts, ignore_index=True)
+        entries = entries[entries["name"] != ""].drop_duplicates()
+        entries = entries.assign(norm=entries["name"].map(normalize)).drop_duplicates(["player_id", "norm"])
+        return cls(entries["name"].tolist(), entries["player_id"].to_numpy(), entries["norm"].tolist())
+
+    def __len__(self):
+        return len(self.names)
+
+    def mask(self, player_ids):
+        """Entry mask of the given players, for search(allowed=...)."""
+        return np.isin(self.player_ids, np.asarray(list(player_ids), dtype=np.int64))
+
+    def _prefix_range(self, token):
+        """Positions [lo, hi) of the name tokens starting with `token`."""
+        return bisect.bisect_left(self.tokens, token), bisect.bisect_left(self.tokens, token + "\uffff")
+
+    def _has_token_in(self, entries, lo, hi):
+        """Mask of the entries with a name token at a position in [lo, hi)."""
+        starts = self._entry_offsets[entries]
+        counts = self._entry_offsets[entries + 1] - starts
+        owner = np.repeat(np.arange(len(entries)), counts)
+        positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+        tokens = self._entry_tokens[positions]
+        return np.bincount(owner, weights=(tokens >= lo) & (tokens < hi), minlength=len(entries)) > 0
+
+    def _shortest(self, entries, allowed=None, n=CANDIDATES):
+        """The (at most) n allowed entries with the shortest names, duplicates removed."""
+        if allowed is not None:
+            entries = entries[allowed[entries]]
+        entries = np.unique(entries) if len(entries) <= n else entries
+        if len(entries) > n:
+            entries = np.unique(entries[np.argpartition(self._name_lengths[entries], n)[:n]])
+        return entries
+
+    def _has_all(self, entries, grams):
+        """Mask of the entries containing every trigram in grams."""
+        mask = np.ones(len(entries), dtype=bool)
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return np.zeros(len(entries), dtype=bool)
+            i = np.minimum(np.searchsorted(posting, entries), len(posting) - 1)
+            mask &= posting[i] == entries
+        return mask
+
+    def _similarity(self, entries, grams):
+        """Dice similarity between the entries' trigrams and the query's."""
+        shared = np.zeros(len(entries), dtype=np.int64)
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is not None:
+                i = np.minimum(np.searchsorted(posting, entries), len(posting) - 1)
+                shared += posting[i] == entries
+        return 2 * shared / (len(grams) + self._trigram_counts[entries])
+
+    def _prefix_candidates(self, tokens, allowed=None):
+        """Entries where every query token starts one of the name's tokens (shortest names)."""
+        ranges = sorted((self._prefix_range(token) for token in tokens),
+                        key=lambda r: self._token_offsets[r[1]] - self._token_offsets[r[0]])
+        lo, hi = ranges[0]
+        entries = self._token_entries[self._token_offsets[lo]:self._token_offsets[hi]]
+        if len(ranges) == 1:
+            return self._shortest(entries, allowed)
+        entries = np.unique(entries)
+        if allowed is not None:
+            entries = entries[allowed[entries]]
+        for lo, hi in ranges[1:]:
+            entries = entries[self._has_token_in(entries, lo, hi)]
+        return self._shortest(entries)
+
+    def _substring_candidates(self, q, inner, allowed=None):
+        """Entries whose name contains q, found from the rarest of its trigrams."""
+        lists = sorted((self.postings.get(g, np.empty(0, dtype=np.int32)) for g in inner), key=len)
+        entries = self._shortest(lists[0], allowed)
+        entries = entries[self._has_all(entries, inner)]
+        return np.array([e for e in entries.tolist() if q in self.norms[e]], dtype=np.int32)
+
+    def _fuzzy_candidates(self, grams, allowed=None):
+        """Entries sharing one of the query's rarest trigrams (at most about CANDIDATES)."""
+        lists = (self.postings[g] for g in grams if g in self.postings)
+        if allowed is not None:
+            lists = (posting[allowed[posting]] for posting in lists)
+        lists = sorted(lists, key=len)
+        picked, total = [], 0
+        for posting in lists:
+            if picked and total + len(posting) > CANDIDATES:
+                break
+            picked.append(posting)
+            total += len(posting)
+        return self._shortest(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int32)
+
+    def search(self, query, limit=10, allowed=None):
+        """
+        Ranked matches for a query: exact names first, then names where every query
+        token starts a name token ('jan sin'), then names containing the query,
+        then similar names (typos), best trigram similarity first. Every tier only
+        looks at a bounded number of candidates, the shortest names first.
+
+        allowed: optional entry mask (see mask()), only those entries are searched;
+                 applied before the candidates are bounded, so a narrow filter
+                 still fills `limit`
+        Returns [(name, player_id, score)], one per player.
+        """
+        q = normalize(query)
+        if not q or not len(self):
+            return []
+        grams = trigrams(q)
+        inner = trigrams(q, pad=False)
+
+        # (entries, scores) per tier; an entry found by several tiers is listed
+        # again with a lower score and skipped below
+        exact = np.array(self.exact.get(q, []), dtype=np.int32)
+        found = [(exact if allowed is None else exact[allowed[exact]], None)]
+        found.append((self._prefix_candidates(q.split(), allowed), PREFIX))
+        if inner:
+            found.append((self._substring_candidates(q, inner, allowed), SUBSTRING))
+        # typo matches only when the better tiers leave room for them
+        if sum(len(entries) for entries, _ in found) < limit:
+            found.append((self._fuzzy_candidates(grams, allowed), 0.0))
+
+        entries = np.concatenate([entries for entries, _ in found])
+        if not len(entries):
+            return []
+        similarity = self._similarity(entries, grams)
+        values = np.concatenate([np.full(len(e), EXACT + 1.0) if tier is None else tier + similarity[start:start + len(e)]
+                                 for (e, tier), start in zip(found, np.cumsum([0] + [len(e) for e, _ in found]))])
+        keep = values >= MIN_SIMILARITY
+        entries, values = entries[keep], values[keep]
+        # best score first, then shorter names
+        order = np.lexsort((self._name_lengths[entries], -values))
+
+        results, seen = [], set()
+        for i in order.tolist():
+            player_id = int(self.player_ids[entries[i]])
+            if player_id in seen:
+                continue
+            seen.add(player_id)
+            results.append((self.names[entries[i]], player_id, round(float(values[i]), 4)))
+            if len(results) == limit:
+                break
+        return results
+
+    def resolve(self, name):
+        """player_id of an exactly spelled name (ignoring accents / case / punctuation), else None."""
+        entries = self.exact.get(normalize(name))
+        return int(self.player_ids[entries[0]]) if entries else None
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from src.model.player_index import NUMERIC_FIELDS, STAT_COLUMNS, match_positions
+
+# numeric fields of an as-of record: the PlayerIndex stats plus the player's pre-match Elo
+AS_OF_FIELDS = NUMERIC_FIELDS + ["elo"]
+
+# days per key: dates up to ~700 years after the first match fit in the sort keys
+DAY_SPAN = 1 << 18
+
+
+def to_days(dates):
+    """Dates (anything pd.to_datetime reads, scalar or array) as int64 days since the epoch."""
+    if np.ndim(dates):
+        return pd.to_datetime(np.asarray(dates)).to_numpy().astype("datetime64[D]").astype(np.int64)
+    return np.datetime64(pd.Timestamp(dates), "D").astype(np.int64)
+
+
+class AsOfIndex:
+    """
+    Point-in-time view of the feature dataset: a player's stats and the h2h record
+    of a pair as they were before a given date, without filtering the frame.
+
+    Player ids map to dense codes. Every player's records (one per match, holding that
+    match's pre-match values) sit in one array sorted by (player, date, match order), and every
+    meeting in one array sorted by (pair, date) with running win counts, so both
+    queries are one np.searchsorted on a (key, day) int64 array: O(log n) per query,
+    vectorized for batches.
+
+    "As of a date" means only matches with tourney_date strictly before it count, so a
+    tournament is replayed without its own results.
+    """
+
+    def __init__(self, ids, player_keys, values, hand_codes, hands, pair_keys, pair_first, low_wins, day0):
+        self.ids = ids                  # sorted player ids, code = position
+        self.player_keys = player_keys  # sorted player code * DAY_SPAN + day
+        self.values = values            # shape (records, len(AS_OF_FIELDS)), same order
+        self.hand_codes = hand_codes    # shape (records,)
+        self.hands = list(hands)
+        self.pair_keys = pair_keys      # sorted pair code * DAY_SPAN + day, one per meeting
+        self.pair_first = pair_first    # position of the pair's first meeting
+        self.low_wins = low_wins        # wins of the lower code up to and including the meeting
+        self.day0 = day0
+
+    @classmethod
+    def from_frame(cls, df):
+        n = len(df)
+        day = to_days(df["tourney_date"])
+        day0 = int(day.min()) - 1 if n else 0
+        ids = np.unique(np.concatenate([df["winner_id"].to_numpy(np.int64), df["loser_id"].to_numpy(np.int64)]))
+        position = match_positions(df)
+        winner = np.searchsorted(ids, df["winner_id"].to_numpy(np.int64))
+        loser = np.searchsorted(ids, df["loser_id"].to_numpy(np.int64))
+
+        sides = []
+        for side, code in (("winner", winner), ("loser", loser)):
+            part = pd.DataFrame({"code": code, "day": day - day0, "position": position})
+            for field, col in STAT_COLUMNS.items():
+                part[field] = df[f"{side}_{col}"].to_numpy()
+            part["elo"] = df[f"{side}_elo"].to_numpy() if f"{side}_elo" in df else np.nan
+            sides.append(part)
+        long = pd.concat(sides, ignore_index=True).sort_values(["code", "day", "position"], kind="stable")
+        hand_codes, hands = pd.factorize(long["hand"])
+
+        low = np.minimum(winner, loser)
+        pair_keys = (low * len(ids) + np.maximum(winner, loser)) * DAY_SPAN + (day - day0)
+        order = np.argsort(pair_keys, kind="stable")
+        pair_keys = pair_keys[order]
+        pair = pair_keys // DAY_SPAN
+        first = np.r_[True, pair[1:] != pair[:-1]] if n else np.zeros(0, dtype=bool)
+
+        return cls(
+            ids,
+            long["code"].to_numpy(np.int64) * DAY_SPAN + long["day"].to_numpy(),
+            long[AS_OF_FIELDS].to_numpy(dtype="float64"),
+            hand_codes, hands,
+            pair_keys,
+            np.maximum.accumulate(np.where(first, np.arange(n), 0)) if n else np.zeros(0, dtype=np.int64),
+            np.cumsum((winner == low).astype(np.int64)[order]),
+            day0,
+        )
+
+    def _codes(self, player_ids):
+        """Dense codes of player ids (-1 for ids without any match)."""
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        i = np.minimum(np.searchsorted(self.ids, player_ids), len(self.ids) - 1)
+        return np.where(self.ids[i] == player_ids, i, -1)
+
+    def _days(self, dates):
+        return np.clip(to_days(dates) - self.day0, 0, DAY_SPAN - 1)
+
+    def _last_before(self, keys, sorted_keys):
+        """Position of the last sorted key of the same group before each (group, day) key, -1 if none."""
+        i = np.searchsorted(sorted_keys, keys, side="left") - 1
+        same = sorted_keys[np.maximum(i, 0)] // DAY_SPAN == keys // DAY_SPAN
+        return np.where((i >= 0) & same, i, -1)
+
+    def record_rows(self, player_ids, dates):
+        """Row of each player's last record before the date (-1 when there is none)."""
+        codes = self._codes(player_ids)
+        rows = self._last_before(np.maximum(codes, 0) * DAY_SPAN + self._days(dates), self.player_keys)
+        return np.where(codes >= 0, rows, -1)
+
+    def stats_rows(self, player_ids, dates):
+        """(values, hand codes) of each player's last record before the date (ValueError if none)."""
+        rows = self.record_rows(player_ids, dates)
+        if (rows < 0).any():
+            missing = np.unique(np.asarray(player_ids)[rows < 0]).tolist()
+            raise ValueError(f"No records found for player ids {missing} before the given dates")
+        return self.values[rows], self.hand_codes[rows]
+
+    def hand_labels(self, hand_codes):
+        """Hand strings of hand codes, unknown hands (code -1) as 'nan' like PlayerIndex.hand_labels."""
+        return np.array(self.hands + ["nan"], dtype=object)[hand_codes]
+
+    def stats(self, player_id, date):
+        """Same fields as PlayerIndex.stats (plus 'elo') from the player's last match before `date`."""
+        values, hand_codes = self.stats_rows([player_id], date)
+        stats = dict(zip(AS_OF_FIELDS, values[0].tolist()))
+        stats["hand"] = self.hands[hand_codes[0]] if hand_codes[0] >= 0 else np.nan
+        return stats
+
+    def h2h_counts(self, ids1, ids2, dates):
+        """(meetings, wins of ids1) of every pair over the matches before the dates."""
+        codes1, codes2 = self._codes(ids1), self._codes(ids2)
+        if len(self.pair_keys) == 0:
+            return np.zeros(len(codes1), dtype=np.int64), np.zeros(len(codes1), dtype=np.int64)
+        low, high = np.minimum(codes1, codes2), np.maximum(codes1, codes2)
+        keys = (np.maximum(low, 0) * len(self.ids) + high) * DAY_SPAN + self._days(dates)
+        i = np.where((codes1 >= 0) & (codes2 >= 0), self._last_before(keys, self.pair_keys), -1)
+
+        # meetings first..i of the pair, wins from the running count
+        j = np.maximum(i, 0)
+        first = self.pair_first[j]
+        matches = np.where(i >= 0, j - first + 1, 0)
+        before = np.where(first > 0, self.low_wins[np.maximum(first - 1, 0)], 0)
+        low_wins = np.where(i >= 0, self.low_wins[j] - before, 0)
+        return matches, np.where(codes1 == low, low_wins, matches - low_wins)
+
+    def h2h_winrates(self, ids1, ids2, dates, default=0.5):
+        matches, wins = self.h2h_counts(ids1, ids2, dates)
+        return np.where(matches > 0, wins / np.maximum(matches, 1), default)
+
+    def h2h(self, player1_id, player2_id, date, default=0.5):
+        """Winrate of player1 against player2 over their meetings before `date`."""
+        return float(self.h2h_winrates([player1_id], [player2_id], date, default)[0])
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+from src.model.train import DEFAULT_PARAMS, TRAINING_DIR, load_best_params, make_model
+from src.model.training_data import CAT_FEATURES, FEATURES, TARGET, TRAINING_DATA_PATH, build_symmetric_frame, \
+    load_training_frame
+from src.model.win_matrix import file_sha256
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKTEST_DIR = os.path.join(BASE_DIR, "output", "backtest")
+
+CALIBRATION_BINS = 10
+
+
+# ----------------------------------------------------------
+# Cached feature matrix
+# ----------------------------------------------------------
+def feature_matrix(data_path=TRAINING_DATA_PATH, cache_dir=BACKTEST_DIR):
+    """
+    Symmetric training rows (FEATURES, label, year, match) of the whole feature dataset,
+    built once per version of the data and cached as a pickle every fold reads.
+    'match' is the row of the original match, shared by its two orientations.
+    """
+    import pandas as pd
+
+    path = os.path.join(cache_dir, f"features_{file_sha256(data_path)[:16]}.pkl")
+    if os.path.exists(path):
+        return pd.read_pickle(path)
+
+    df = load_training_frame(data_path, extra_columns=["tourney_date"])
+    df["year"] = pd.to_datetime(df["tourney_date"]).dt.year.astype("int16")
+    df["match"] = np.arange(len(df), dtype=np.int32)
+    matrix = build_symmetric_frame(df, extra_columns=["year", "match"])
+    os.makedirs(cache_dir, exist_ok=True)
+    matrix.to_pickle(path)
+    return matrix
+
+
+# ----------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------
+def calibration(prob, label, bins=CALIBRATION_BINS):
+    """Per probability bin: mean predicted, observed rate and rows, plus the expected calibration error."""
+    edges = np.linspace(0, 1, bins + 1)
+    which = np.clip(np.digitize(prob, edges[1:-1]), 0, bins - 1)
+    table = []
+    ece = 0.0
+    for b in range(bins):
+        mask = which == b
+        if not mask.any():
+            continue
+        predicted, observed = float(prob[mask].mean()), float(label[mask].mean())
+        table.append({"bin": f"{edges[b]:.1f}-{edges[b + 1]:.1f}", "predicted": round(predicted, 4),
+                      "observed": round(observed, 4), "rows": int(mask.sum())})
+        ece += mask.mean() * abs(predicted - observed)
+    return table, ece
+
+
+def season_metrics(prob, label):
+    eps = 1e-15
+    p = np.clip(prob, eps, 1 - eps)
+    table, ece = calibration(prob, label)
+    return {
+        "accuracy": float(((prob > 0.5) == (label == 1)).mean()),
+        "log_loss": float(-np.mean(label * np.log(p) + (1 - label) * np.log(1 - p))),
+        "brier": float(np.mean((prob - label) ** 2)),
+        "ece": float(ece),
+        "calibration": table,
+    }
+
+
+# ----------------------------------------------------------
+# Folds
+# ----------------------------------------------------------
+def run_fold(season, params, thread_count=1, data_path=TRAINING_DATA_PATH, cache_dir=BACKTEST_DIR):
+    """
+    Train on every season before `season` and score `season`. Each match is scored in
+    both orientations and averaged like predict_win_probability, so the metrics are
+    over symmetric probabilities (every match counted once per orientation).
+    """
+    from catboost import Pool
+
+    start = time.perf_counter()
+    matrix = feature_matrix(data_path, cache_dir)
+    years = matrix["year"].to_numpy()
+    train, test = matrix[years < season], matrix[years == season]
+
+    model = make_model(params, thread_count, early_stopping_rounds=None)
+    model.fit(Pool(train[FEATURES], train[TARGET], cat_features=CAT_FEATURES))
+    raw = model.predict_proba(Pool(test[FEATURES], cat_features=CAT_FEATURES))[:, 1]
+
+    # average the two orientations of every match: p(as played) and 1 - p(flipped)
+    played = test[TARGET].to_numpy() == 1
+    by_match = dict(zip(test["match"].to_numpy()[~played].tolist(), raw[~played].tolist()))
+    flipped = np.array([by_match[m] for m in test["match"].to_numpy()[played].tolist()])
+    p_played = (raw[played] + (1 - flipped)) / 2
+
+    prob = np.concatenate([p_played, 1 - p_played])
+    label = np.concatenate([np.ones(len(p_played)), np.zeros(len(p_played))])
+    result = {"season": int(season), "train_rows": int(len(train)), "test_matches": int(played.sum())}
+    result.update(season_metrics(prob, label))
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def _run_fold(args):
+    return run_fold(*args)
+
+
+def backtest(first_season=None, last_season=None, params=None, workers=None, threads=None,
+             data_path=TRAINING_DATA_PATH, cache_dir=BACKTEST_DIR, params_dir=TRAINING_DIR):
+    """
+    Walk-forward backtest: for every season Y+1 from first_season (default: the second
+    season in the data) to last_season, train on seasons <= Y and score Y+1. Folds run on
+    a pool of `workers` processes with threads // workers CatBoost threads each and all
+    read the same cached feature matrix. Results are written to
+    backtest_<data sha>.json in cache_dir. Returns the per-season results.
+    params default to the best_params.json of the search run in params_dir.
+    """
+    if params is None:
+        params = load_best_params(params_dir) or DEFAULT_PARAMS
+    start = time.perf_counter()
+    matrix = feature_matrix(data_path, cache_dir)
+    seasons = sorted(int(y) for y in matrix["year"].unique())
+    first_season = seasons[1] if first_season is None else first_season
+    last_season = seasons[-1] if last_season is None else last_season
+    folds = [s for s in seasons if first_season <= s <= last_season]
+    del matrix
+
+    threads = os.cpu_count() if threads is None else threads
+    workers = min(len(folds), threads) if workers is None else workers
+    thread_count = max(1, threads // max(workers, 1))
+    print(f"🔁 {len(folds)} folds ({folds[0]}-{folds[-1]}), {workers} workers x {thread_count} threads, "
+          f"{params['iterations']} iterations")
+
+    args = [(season, params, thread_count, data_path, cache_dir) for season in folds]
+    results = []
+    if workers <= 1:
+        for a in args:
+            results.append(_run_fold(a))
+            print_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(_run_fold, a) for a in args]):
+                results.append(future.result())
+                print_result(results[-1])
+    results.sort(key=lambda r: r["season"])
+
+    path = os.path.join(cache_dir, f"backtest_{file_sha256(data_path)[:16]}.json")
+    with open(path, "w") as f:
+        json.dump({"params": params, "results": results}, f, indent=2)
+    total = sum(r["test_matches"] for r in results)
+    accuracy = sum(r["accuracy"] * r["test_matches"] for r in results) / total
+    log_loss = sum(r["log_loss"] * r["test_matches"] for r in results) / total
+    print(f"✅ {total} matches: accuracy {accuracy:.4f}, log-loss {log_loss:.4f}, "
+          f"wall time {time.perf_counter() - start:.1f}s -> {path}")
+    return results
+
+
+def print_result(r):
+    print(f"  {r['season']}: {r['test_matches']:>5} matches  accuracy {r['accuracy']:.4f}  "
+          f"log-loss {r['log_loss']:.4f}  brier {r['brier']:.4f}  ece {r['ece']:.4f}  {r['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest: train on seasons <= Y, score Y+1")
+    parser.add_argument("--first-season", type=int, help="first scored season (default: second season in the data)")
+    parser.add_argument("--last-season", type=int)
+    parser.add_argument("--iterations", type=int, help="override the iterations of the model params")
+    parser.add_argument("--workers", type=int, help="folds run in parallel (default: one per thread)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="CPU threads to use in total")
+    args = parser.parse_args()
+
+    params = dict(load_best_params() or DEFAULT_PARAMS)
+    if args.iterations:
+        params["iterations"] = args.iterations
+    backtest(args.first_season, args.last_season, params, args.workers, args.threads)
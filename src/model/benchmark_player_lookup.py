@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+from src.model.player_index import PlayerIndex, STAT_COLUMNS, match_positions
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scan_player_stats(df, player_name):
+    """The previous get_player_stats: two masks + sort over the full frame per call (in match order)."""
+    records = df[(df["winner_name"] == player_name) | (df["loser_name"] == player_name)]
+    if records.empty:
+        raise ValueError(f"No records found for {player_name}")
+    record = records.iloc[int(np.argmax(match_positions(records)))]
+    side = "winner" if record["winner_name"] == player_name else "loser"
+    return {field: record[f"{side}_{col}"] for field, col in STAT_COLUMNS.items()}
+
+
+def time_calls(fn, players, repeat=1):
+    latencies = []
+    for _ in range(repeat):
+        for name in players:
+            start = time.perf_counter()
+            fn(name)
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1e6  # microseconds
+
+
+def report(label, latencies):
+    print(f"{label:<14} mean {latencies.mean():>10.2f}us  p50 {np.percentile(latencies, 50):>10.2f}us  "
+          f"p99 {np.percentile(latencies, 99):>10.2f}us  ({len(latencies)} calls)")
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(os.path.join(BASE_DIR, "output", "feature_dataset_light.csv"))
+    print(f"Dataset: {len(df)} matches, {df['tourney_date'].min()} - {df['tourney_date'].max()}")
+
+    start = time.perf_counter()
+    index = PlayerIndex.from_frame(df)
+    print(f"Index build: {(time.perf_counter() - start) * 1e3:.1f}ms for {len(index)} players")
+
+    players_2024 = df[df['tourney_date'].astype(str).str.startswith('2024')]
+    players = sorted(set(players_2024['winner_name']).union(set(players_2024['loser_name'])))
+
+    # both paths must agree before timing them
+    for name in players:
+        old, new = scan_player_stats(df, name), index.stats(name)
+        for field in STAT_COLUMNS:
+            if pd.isna(old[field]) and pd.isna(new[field]):
+                continue
+            assert old[field] == new[field], (name, field, old[field], new[field])
+
+    before = time_calls(lambda name: scan_player_stats(df, name), players)
+    after = time_calls(index.stats, players, repeat=100)
+    report("scan (before)", before)
+    report("index (after)", after)
+    print(f"Speed-up (p50): {np.percentile(before, 50) / np.percentile(after, 50):.0f}x")
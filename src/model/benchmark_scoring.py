@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+from src.model.benchmark_player_lookup import report, time_calls
+from src.model.loader import get_resources
+from src.model.training_data import FEATURES as features
+
+
+def dataframe_predict(model, stats, h2h, player1_name, player2_name):
+    """The previous predict_win_probability body: one single-row DataFrame per orientation."""
+    p1 = stats(player1_name)
+    p2 = stats(player2_name)
+
+    def build_features(a, b, a_name, b_name):
+        return {
+            'ranking_diff': b["rank"] - a["rank"],
+            'rank_points_diff': a["rank_points"] - b["rank_points"],
+            'age_diff': a["age"] - b["age"],
+            'height_diff': a["height"] - b["height"],
+            'same_hand': 1 if a["hand"] == b["hand"] else 0,
+            'hand_matchup': f"{a['hand']}_{b['hand']}",
+            'h2h_winrate': h2h(a_name, b_name),
+            'recent_winrate_diff': a["recent_winrate"] - b["recent_winrate"]
+        }
+
+    X1 = pd.DataFrame([build_features(p1, p2, player1_name, player2_name)])[features]
+    p1_prob_1 = model.predict_proba(X1)[0][1]
+    X2 = pd.DataFrame([build_features(p2, p1, player2_name, player1_name)])[features]
+    p2_prob_2 = model.predict_proba(X2)[0][1]
+
+    p1_prob = (p1_prob_1 + (1 - p2_prob_2)) / 2
+    return p1_prob, 1 - p1_prob
+
+
+if __name__ == "__main__":
+    resources = get_resources()
+    model, scorer = resources.model, resources.scorer
+    player_index, h2h_index = resources.player_index, resources.h2h_index
+
+    # random pairs over every indexed player (all hands, missing stats, pairs that met)
+    rng = np.random.default_rng(0)
+    names = np.array(player_index.names, dtype=object)
+    pairs = names[rng.integers(len(names), size=(2000, 2))].tolist()
+    for row in rng.integers(len(h2h_index.keys), size=500):
+        low, high = divmod(int(h2h_index.keys[row]), len(player_index))
+        pairs.append([names[low], names[high]])
+    print(f"Parity over {len(pairs)} pairs ({len(player_index.hands)} hands: {player_index.hands})")
+
+    # both paths must give the same probabilities before timing them
+    worst = 0.0
+    for p1, p2 in pairs:
+        old = dataframe_predict(model, player_index.stats, h2h_index.winrate, p1, p2)
+        new = scorer.predict(p1, p2)
+        new_stats = scorer.predict_stats(player_index.stats(p1), player_index.stats(p2),
+                                         h2h_index.winrate(p1, p2), h2h_index.winrate(p2, p1))
+        worst = max(worst, abs(old[0] - new[0]), abs(old[0] - new_stats[0]))
+        assert round(old[0], 4) == round(new[0], 4) == round(new_stats[0], 4), (p1, p2, old, new, new_stats)
+    print(f"Max abs difference: {worst:.2e}")
+
+    timed = pairs[:300]
+    before = time_calls(lambda pair: dataframe_predict(model, player_index.stats, h2h_index.winrate, *pair), timed)
+    after = time_calls(lambda pair: scorer.predict(*pair), timed, repeat=5)
+    report("pandas (before)", before)
+    report("native (after)", after)
+    print(f"Speed-up (p50): {np.percentile(before, 50) / np.percentile(after, 50):.1f}x  "
+          f"(p99): {np.percentile(before, 99) / np.percentile(after, 99):.1f}x")
@@ -0,0 +1,116 @@
+import argparse
+import os
+
+import pandas as pd
+
+from src.data_engineer.feature_pipeline import clean
+from src.data_engineer.incremental import FeatureState
+from src.data_engineer.match_order import chronological_order
+from src.data_engineer.match_store import load_matches
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_PATH = os.path.join(BASE_DIR, "output", "online_feature_store.pkl")
+
+# per-player profile fields: store key -> match column suffix (winner_<x> / loser_<x>)
+PROFILE_FIELDS = {
+    "rank": "rank",
+    "rank_points": "rank_points",
+    "age": "age",
+    "height": "ht",
+    "hand": "hand",
+}
+
+MATCH_COLUMNS = ["tourney_id", "match_num", "round", "tourney_date", "surface",
+                 "winner_id", "loser_id", "winner_name", "loser_name"] + [
+    f"{side}_{col}" for side in ("winner", "loser") for col in PROFILE_FIELDS.values()
+]
+
+
+class OnlineFeatureStore(FeatureState):
+    """
+    Live per-player / per-pair state for predictions: latest rank, points, age,
+    height and hand of every player, their rolling form window, overall / surface
+    Elo ratings and the h2h counters of every pair. update_match() is O(1) per result.
+
+    State is keyed by player id; names are only resolved when reading, a name
+    shared by several players meaning the one whose match was folded in last.
+    """
+
+    def __init__(self, window=5):
+        super().__init__(window)
+        self.players = {}   # player id -> latest known profile
+        self.ids = {}       # player name -> player id
+
+    def update_match(self, match):
+        """
+        Fold one finished match into the store.
+        `match` is any mapping with winner_id / loser_id, winner_name / loser_name and
+        the winner_* / loser_* profile columns (tourney_date, match_id and surface are optional).
+        """
+        for side in ("winner", "loser"):
+            player_id = int(match[f"{side}_id"])
+            self.ids[match[f"{side}_name"]] = player_id
+            profile = self.players.setdefault(player_id, {})
+            for field, col in PROFILE_FIELDS.items():
+                value = match.get(f"{side}_{col}")
+                # keep the last known value when a result comes without it
+                if value is not None and not pd.isna(value):
+                    profile[field] = value
+        self.update(int(match["winner_id"]), int(match["loser_id"]), match.get("tourney_date"), match.get("match_id"),
+                    match.get("surface"))
+
+    def player_stats(self, player_name):
+        """Same fields as predict_win_probability.get_player_stats, from the current state."""
+        if player_name not in self.ids:
+            raise ValueError(f"No records found for {player_name}")
+        player_id = self.ids[player_name]
+        profile = self.players[player_id]
+        stats = {field: profile.get(field, float("nan")) for field in PROFILE_FIELDS}
+        recent = self.recent_winrate(player_id)
+        stats["recent_winrate"] = 0.5 if recent is None else recent
+        stats["elo"] = self.elo.rating_of(player_id)
+        return stats
+
+    def elo_rating(self, player_name, surface=None):
+        """Current overall Elo (surface Elo when `surface` is given) of a player."""
+        if player_name not in self.ids:
+            raise ValueError(f"No records found for {player_name}")
+        return self.elo.rating_of(self.ids[player_name], surface)
+
+    def head_to_head(self, player1_name, player2_name):
+        """Winrate of player1 against player2 over all their meetings (0.5 if they never met)."""
+        if player1_name not in self.ids or player2_name not in self.ids:
+            return 0.5
+        winrate = self.h2h_winrate(self.ids[player1_name], self.ids[player2_name])
+        return 0.5 if winrate is None else winrate
+
+    @classmethod
+    def from_matches(cls, df, window=5):
+        store = cls(window)
+        df = df.iloc[chronological_order(df)]
+        for match in df.to_dict("records"):
+            store.update_match(match)
+        return store
+
+
+def build_store(path=STORE_PATH, window=5):
+    """Replay the full match history from the match store and snapshot the result."""
+    df = clean(load_matches(columns=MATCH_COLUMNS))
+    store = OnlineFeatureStore.from_matches(df, window)
+    store.save(path)
+    return store
+
+
+def load_store(path=STORE_PATH):
+    """Load the snapshot written by build_store (or by a live process after updates)."""
+    return OnlineFeatureStore.load(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the online feature store snapshot")
+    parser.add_argument("--path", default=STORE_PATH)
+    parser.add_argument("--window", type=int, default=5)
+    args = parser.parse_args()
+
+    store = build_store(args.path, args.window)
+    print(f"✅ Saved online feature store ({len(store.players)} players, {len(store.h2h)} pairs) to {args.path}")
@@ -0,0 +1,168 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "model", "catboost_model.cbm")
+DATA_PATH = os.path.join(BASE_DIR, "output", "feature_dataset_light.csv")
+
+# compact dtypes of the feature dataset columns the indexes and pages read
+DATA_DTYPES = {
+    "winner_id": "int32", "loser_id": "int32", "match_num": "int32",
+    "tourney_id": "category", "surface": "category", "round": "category",
+    "tourney_name": "category", "winner_name": "category", "loser_name": "category",
+    "winner_hand": "category", "loser_hand": "category", "hand_matchup": "category",
+}
+
+# seconds spent in each startup step, filled as the steps run
+startup_timings = {}
+
+_lock = threading.Lock()
+_resources = None
+_streamlit_loader = None
+_version = (None, None)  # (file stamps, version) of MODEL_PATH and DATA_PATH
+
+
+class Resources:
+    """The model and feature data every prediction needs, loaded once per process."""
+
+    def __init__(self, model, df, player_index, h2h_index, scorer, version, elo=None, as_of=None):
+        self.model = model
+        self.df = df
+        self.player_index = player_index
+        self.h2h_index = h2h_index
+        self.scorer = scorer
+        self.elo = elo           # EloRatings after every match of df
+        self.as_of = as_of       # AsOfIndex: stats / h2h before any date
+        self.version = version   # sha256 of the model and feature files they came from
+
+
+def _timed(step, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    startup_timings[step] = time.perf_counter() - start
+    return result
+
+
+def _load_model(path):
+    from catboost import CatBoostClassifier
+    model = CatBoostClassifier()
+    model.load_model(path)
+    return model
+
+
+def _load_data(path):
+    import pandas as pd
+    return pd.read_csv(path, dtype=DATA_DTYPES, parse_dates=["tourney_date"], date_format="%Y-%m-%d")
+
+
+def _build_indexes(df):
+    from src.model.player_index import H2HIndex, PlayerIndex
+    player_index = PlayerIndex.from_frame(df)
+    return player_index, H2HIndex.from_frame(df, player_index)
+
+
+def _load_elo(df, data_path, data_sha256):
+    """
+    Final Elo ratings saved next to the dataset by the feature build, replayed from df
+    in memory when missing or stale (loading never writes to the output folder).
+    """
+    from src.data_engineer.elo import EloRatings, load_ratings
+    ratings = load_ratings(data_path, data_sha256)
+    return EloRatings.from_matches(df) if ratings is None else ratings
+
+
+def _build_as_of(df):
+    from src.model.asof_index import AsOfIndex
+    return AsOfIndex.from_frame(df)
+
+
+def resource_version():
+    """
+    sha256 of the model and the feature dataset ({"model_sha256", "data_sha256"}).
+    The files are only rehashed when their mtime or size changes, so this is cheap
+    enough to check on every prediction.
+    """
+    global _version
+    stamps = tuple((os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in (MODEL_PATH, DATA_PATH))
+    if _version[0] != stamps:
+        from src.model.win_matrix import current_version
+        _version = (stamps, current_version(MODEL_PATH, DATA_PATH))
+    return _version[1]
+
+
+def load_resources(model_path=MODEL_PATH, data_path=DATA_PATH):
+    """Load the model and feature data and build the lookup indexes (no caching)."""
+    from src.model.win_matrix import current_version
+
+    version = current_version(model_path, data_path)
+    model = _timed("model_load", _load_model, model_path)
+    df = _timed("data_load", _load_data, data_path)
+    player_index, h2h_index = _timed("index_build", _build_indexes, df)
+    elo = _timed("elo_load", _load_elo, df, data_path, version["data_sha256"])
+    as_of = _timed("as_of_build", _build_as_of, df)
+
+    from src.model.native_scorer import NativeScorer
+    scorer = NativeScorer(model, player_index, h2h_index)
+    return Resources(model, df, player_index, h2h_index, scorer, version, elo, as_of)
+
+
+def _in_streamlit():
+    try:
+        from streamlit import runtime
+    except ImportError:
+        return False
+    return runtime.exists()
+
+
+def get_resources():
+    """
+    Process-wide, thread-safe singleton of the model and data, loaded on first use
+    and reloaded when catboost_model.cbm or the feature dataset is rebuilt.
+    Inside a Streamlit server it is held by st.cache_resource, so every session and
+    page shares one copy (and "Clear cache" reloads it).
+    """
+    global _resources, _streamlit_loader
+    version = resource_version()
+    if _in_streamlit():
+        if _streamlit_loader is None:
+            import streamlit as st
+            _streamlit_loader = st.cache_resource(show_spinner="Loading model and data...")(load_resources)
+        resources = _streamlit_loader()
+        if resources.version != version:
+            _streamlit_loader.clear()
+            resources = _streamlit_loader()
+        return resources
+
+    if _resources is None or _resources.version != version:
+        with _lock:
+            if _resources is None or _resources.version != version:
+                _resources = load_resources()
+    return _resources
+
+
+def warmup():
+    """Load everything now instead of on the first prediction; returns the startup timings."""
+    get_resources()
+    return dict(startup_timings)
+
+
+def startup_report():
+    lines = ["Startup time:"]
+    for step in ("import", "model_load", "data_load", "index_build", "elo_load", "as_of_build"):
+        if step in startup_timings:
+            lines.append(f"  {step:<12} {startup_timings[step] * 1e3:8.1f} ms")
+    lines.append(f"  {'total':<12} {sum(startup_timings.values()) * 1e3:8.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    import src.model.predict_win_probability  # noqa: F401  (measures the import alone)
+    startup_timings["import"] = time.perf_counter() - start
+
+    warmup()
+    print(startup_report())
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+from src.data_engineer.match_order import chronological_order
+
+# stats field -> column suffix in the feature dataset (winner_<x> / loser_<x>)
+STAT_COLUMNS = {
+    "rank": "rank",
+    "rank_points": "rank_points",
+    "age": "age",
+    "height": "ht",
+    "hand": "hand",
+    "recent_winrate": "recent_winrate",
+}
+
+NUMERIC_FIELDS = ["rank", "rank_points", "age", "height", "recent_winrate"]
+
+
+def match_positions(df):
+    """
+    Position of every row of df in match order (match_order.chronological_order), or
+    in tourney_date order for frames without the tourney_id / round / match_num keys.
+    The yearly files list a tournament's rounds in reverse, so file order is not match order.
+    """
+    if all(c in df for c in ("tourney_id", "round", "match_num")):
+        order = chronological_order(df)
+    else:
+        order = np.argsort(df["tourney_date"].to_numpy(), kind="stable")
+    positions = np.empty(len(df), dtype=np.int64)
+    positions[order] = np.arange(len(df))
+    return positions
+
+
+class PlayerIndex:
+    """
+    Latest-record features of every player, built once from the feature dataset.
+
+    Numeric stats live in one float64 array (one row per player), hands are stored
+    as codes into a small vocabulary and player names map to their row, so a lookup
+    is one dict access plus an array read.
+
+    Rows are players (player ids when the dataset has winner_id / loser_id), ordered
+    by their latest match in match order (see match_positions); a name shared by
+    several players resolves to the one who played most recently.
+    """
+
+    def __init__(self, names, values, hand_codes, hands, ids=None):
+        self.names = list(names)
+        self.position = {name: i for i, name in enumerate(self.names)}
+        self.ids = None if ids is None else np.asarray(ids, dtype=np.int64)
+        if self.ids is not None:
+            self._id_order = np.argsort(self.ids)
+            self._sorted_ids = self.ids[self._id_order]
+        self.values = values            # shape (players, len(NUMERIC_FIELDS))
+        self.hand_codes = hand_codes    # shape (players,)
+        self.hands = list(hands)
+        # hand strings by code, unknown hands (code -1) render as 'nan' like f"{np.nan}"
+        self._hand_labels = np.array(self.hands + ["nan"], dtype=object)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Index the latest record of each player (their last match in match order)."""
+        n = len(df)
+        position = match_positions(df)
+        key = "id" if "winner_id" in df and "loser_id" in df else "name"
+        sides = []
+        for side in ("winner", "loser"):
+            part = pd.DataFrame({
+                "id": df[f"{side}_{key}"].to_numpy(),
+                "name": df[f"{side}_name"].to_numpy(),
+                "position": position,
+            })
+            for field, col in STAT_COLUMNS.items():
+                part[field] = df[f"{side}_{col}"].to_numpy()
+            sides.append(part)
+        long = pd.concat(sides, ignore_index=True)
+
+        # a player appears once per match, so the match position orders their records
+        long = long.sort_values("position", kind="stable").drop_duplicates("id", keep="last")
+
+        hand_codes, hands = pd.factorize(long["hand"])
+        values = long[NUMERIC_FIELDS].to_numpy(dtype="float64")
+        return cls(long["name"].tolist(), values, hand_codes, hands, long["id"] if key == "id" else None)
+
+    def __contains__(self, player_name):
+        return player_name in self.position
+
+    def __len__(self):
+        return len(self.names)
+
+    def positions(self, player_names):
+        """Rows of many players at once (ValueError listing any unknown name)."""
+        rows = [self.position.get(name, -1) for name in player_names]
+        rows = np.asarray(rows, dtype=np.int64)
+        if (rows < 0).any():
+            missing = [name for name, i in zip(player_names, rows) if i < 0]
+            raise ValueError(f"No records found for {missing}")
+        return rows
+
+    def id_positions(self, player_ids):
+        """Rows of many player ids at once (ValueError listing any unknown id)."""
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        i = np.minimum(np.searchsorted(self._sorted_ids, player_ids), len(self._sorted_ids) - 1)
+        found = self._sorted_ids[i] == player_ids
+        if not found.all():
+            raise ValueError(f"No records found for player ids {player_ids[~found].tolist()}")
+        return self._id_order[i]
+
+    def player_id(self, player_name):
+        """Id of the player behind a name (None without ids or for an unknown name)."""
+        i = self.position.get(player_name)
+        return None if i is None or self.ids is None else int(self.ids[i])
+
+    def column(self, field, rows):
+        return self.values[rows, NUMERIC_FIELDS.index(field)]
+
+    def hand_labels(self, rows):
+        return self._hand_labels[self.hand_codes[rows]]
+
+    def stats(self, player_name):
+        i = self.position.get(player_name)
+        if i is None:
+            raise ValueError(f"No records found for {player_name}")
+        stats = dict(zip(NUMERIC_FIELDS, self.values[i].tolist()))
+        code = self.hand_codes[i]
+        stats["hand"] = self.hands[code] if code >= 0 else np.nan
+        return stats
+
+
+class H2HIndex:
+    """
+    Head-to-head record of every pair that met, as sorted int64 pair keys
+    (lower player row, higher player row) with match and win counts, so records
+    of many pairs are found with one np.searchsorted.
+    """
+
+    def __init__(self, player_index, keys, matches, low_wins):
+        self.player_index = player_index
+        self.keys = keys
+        self.matches = matches
+        self.low_wins = low_wins
+
+    @classmethod
+    def from_frame(cls, df, player_index):
+        if player_index.ids is not None:
+            winner = player_index.id_positions(df["winner_id"].to_numpy())
+            loser = player_index.id_positions(df["loser_id"].to_numpy())
+        else:
+            winner = player_index.positions(df["winner_name"].tolist())
+            loser = player_index.positions(df["loser_name"].tolist())
+        low, high = np.minimum(winner, loser), np.maximum(winner, loser)
+        pairs = pd.DataFrame({"key": low * len(player_index) + high, "low_win": (winner == low).astype(np.int64)})
+        grouped = pairs.groupby("key")["low_win"].agg(["size", "sum"])
+        return cls(player_index, grouped.index.to_numpy(np.int64),
+                   grouped["size"].to_numpy(np.int64), grouped["sum"].to_numpy(np.int64))
+
+    def winrate_rows(self, rows1, rows2, default=0.5):
+        """Winrate of rows1 against rows2 for arrays of player rows."""
+        rows1, rows2 = np.asarray(rows1, dtype=np.int64), np.asarray(rows2, dtype=np.int64)
+        if len(self.keys) == 0:
+            return np.full(len(rows1), default, dtype="float64")
+        low = np.minimum(rows1, rows2)
+        keys = low * len(self.player_index) + np.maximum(rows1, rows2)
+        i = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[i] == keys
+
+        matches = np.where(found, self.matches[i], 0)
+        low_wins = np.where(found, self.low_wins[i], 0)
+        wins = np.where(rows1 == low, low_wins, matches - low_wins)
+        return np.where(matches > 0, wins / np.maximum(matches, 1), default)
+
+    def winrate(self, player1_name, player2_name, default=0.5):
+        if player1_name not in self.player_index or player2_name not in self.player_index:
+            return default
+        rows = self.player_index.positions([player1_name, player2_name])
+        return float(self.winrate_rows(rows[:1], rows[1:], default)[0])
@@ -1,91 +1,221 @@
 import os
-from catboost import CatBoostClassifier
+import sys
+import numpy as np
 import pandas as pd
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
 
-model = CatBoostClassifier()
-model.load_model(os.path.join(BASE_DIR, "model", "catboost_model.cbm"))
+from src.data_engineer.elo import expected_score
+from src.model.loader import get_resources, resource_version, warmup  # noqa: F401  (re-exported startup hook)
+from src.model.player_index import NUMERIC_FIELDS
+from src.model.prediction_cache import PredictionCache
+from src.model.training_data import FEATURES
 
-df = pd.read_csv(os.path.join(BASE_DIR, "output", "feature_dataset_light.csv"))
+# The model, the feature dataset and the lookup indexes built from it (player ->
+# latest-record features, (player, player) -> h2h record) are loaded lazily, once
+# per process, by src/model/loader.py. Call warmup() to load them ahead of time.
+_LAZY_ATTRIBUTES = ("model", "df", "player_index", "h2h_index")
 
-features = [
-    'ranking_diff', 'rank_points_diff',
-    'age_diff', 'height_diff',
-    'same_hand', 'hand_matchup',
-    'h2h_winrate', 'recent_winrate_diff'
-]
 
-def calculate_h2h_winrate(player1_name, player2_name):
-    h2h_matches = df[
-        ((df["winner_name"] == player1_name) & (df["loser_name"] == player2_name)) |
-        ((df["winner_name"] == player2_name) & (df["loser_name"] == player1_name))
-    ]
-    if h2h_matches.empty:
+def __getattr__(name):
+    # keeps `from predict_win_probability import df` working without loading at import
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(get_resources(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# the model's input columns, defined once in training_data so training and scoring agree
+features = FEATURES
+
+# precomputed all-pairs matrix (win_matrix.py), opened on first use and again after
+# the model or data changes; False if missing or built from other files
+_win_matrix = None
+_win_matrix_version = None
+
+# predictions shared by every session of the process, see prediction_cache_stats()
+prediction_cache = PredictionCache()
+
+
+def get_win_matrix():
+    global _win_matrix, _win_matrix_version
+    version = resource_version()
+    if _win_matrix is None or _win_matrix_version != version:
+        from src.model.win_matrix import load_matrix
+        matrix = load_matrix(check_version=False)
+        _win_matrix = matrix if matrix and matrix.version == version else False
+        _win_matrix_version = version
+    return _win_matrix
+
+
+def prediction_cache_stats():
+    """Size and hit / miss / eviction / expiration / invalidation counters of the cache."""
+    return prediction_cache.stats()
+
+
+def calculate_h2h_winrate(player1_name, player2_name, as_of=None):
+    """H2H winrate of player1 against player2, over their meetings before `as_of` when given."""
+    resources = get_resources()
+    if as_of is None:
+        return resources.h2h_index.winrate(player1_name, player2_name)
+    player_index = resources.player_index
+    if player1_name not in player_index or player2_name not in player_index:
         return 0.5
-    wins = (h2h_matches["winner_name"] == player1_name).sum()
-    return wins / len(h2h_matches)
-
-def get_player_stats(player_name):
-    records = df[(df["winner_name"] == player_name) | (df["loser_name"] == player_name)]
-    if records.empty:
-        raise ValueError(f"No records found for {player_name}")
-    record = records.sort_values("tourney_date").iloc[-1]
-    if record["winner_name"] == player_name:
-        return {
-            "rank": record["winner_rank"],
-            "rank_points": record["winner_rank_points"],
-            "age": record["winner_age"],
-            "height": record["winner_ht"],
-            "hand": record["winner_hand"],
-            "recent_winrate": record["winner_recent_winrate"]
-        }
+    return resources.as_of.h2h(player_index.player_id(player1_name), player_index.player_id(player2_name), as_of)
+
+def get_player_stats(player_name, as_of=None):
+    """
+    Latest stats of a player with the current Elo, or with `as_of` (a date) the
+    stats of their last match before that date (and the Elo they took into it).
+    """
+    resources = get_resources()
+    if as_of is not None:
+        resources.player_index.positions([player_name])  # ValueError for unknown names
+        return resources.as_of.stats(resources.player_index.player_id(player_name), as_of)
+    stats = resources.player_index.stats(player_name)
+    stats["elo"] = resources.elo.rating_of(resources.player_index.player_id(player_name))
+    return stats
+
+def elo_win_probability(player1_name, player2_name, surface=None, store=None):
+    """
+    Win probabilities (p1, p2) from the players' current Elo ratings (surface Elo
+    when `surface` is given), read from the feature dataset or from `store`
+    (feature_store.OnlineFeatureStore) like predict_win_probability.
+    """
+    if store is not None:
+        r1, r2 = store.elo_rating(player1_name, surface), store.elo_rating(player2_name, surface)
     else:
-        return {
-            "rank": record["loser_rank"],
-            "rank_points": record["loser_rank_points"],
-            "age": record["loser_age"],
-            "height": record["loser_ht"],
-            "hand": record["loser_hand"],
-            "recent_winrate": record["loser_recent_winrate"]
-        }
-
-def predict_win_probability(player1_name, player2_name):
+        resources = get_resources()
+        player_index = resources.player_index
+        player_index.positions([player1_name, player2_name])  # ValueError for unknown names
+        r1 = resources.elo.rating_of(player_index.player_id(player1_name), surface)
+        r2 = resources.elo.rating_of(player_index.player_id(player2_name), surface)
+    p1_prob = expected_score(r1, r2)
+    return round(p1_prob, 4), round(1 - p1_prob, 4)
+
+def predict_win_probability(player1_name, player2_name, store=None, as_of=None):
     """
     双向预测稳定版
+    store: optional feature_store.OnlineFeatureStore, stats and h2h are then read
+    from its live state instead of the feature dataset (those are not cached)
+    as_of: optional date, the matchup is scored with the stats and h2h from the
+    matches before that date only (not cached)
     """
-    p1 = get_player_stats(player1_name)
-    p2 = get_player_stats(player2_name)
-
-    def build_features(a, b):
-        return {
-            'ranking_diff': b["rank"] - a["rank"],       # 保持方向性
-            'rank_points_diff': a["rank_points"] - b["rank_points"],
-            'age_diff': a["age"] - b["age"],
-            'height_diff': a["height"] - b["height"],
-            'same_hand': 1 if a["hand"] == b["hand"] else 0,
-            'hand_matchup': f"{a['hand']}_{b['hand']}",
-            'h2h_winrate': calculate_h2h_winrate(a_name, b_name),
-            'recent_winrate_diff': a["recent_winrate"] - b["recent_winrate"]
-        }
-
-    # 第一次：p1 vs p2
-    a_name, b_name = player1_name, player2_name
-    X1 = pd.DataFrame([build_features(p1, p2)])[features]
-    p1_prob_1 = model.predict_proba(X1)[0][1]
-
-    # 第二次：p2 vs p1
-    a_name, b_name = player2_name, player1_name
-    X2 = pd.DataFrame([build_features(p2, p1)])[features]
-    p2_prob_2 = model.predict_proba(X2)[0][1]
-
-    # 平均化
-    p1_prob = (p1_prob_1 + (1 - p2_prob_2)) / 2
-    p2_prob = 1 - p1_prob
+    if as_of is not None:
+        if store is not None:
+            raise ValueError("store and as_of cannot be combined")
+        return _predict_as_of(player1_name, player2_name, as_of)
+    if store is not None:
+        return _predict(player1_name, player2_name, store)
+    return prediction_cache.get_or_compute(player1_name, player2_name, resource_version(), _predict)
+
+
+def _predict_as_of(player1_name, player2_name, as_of):
+    p1_prob, p2_prob = get_resources().scorer.predict_stats(
+        get_player_stats(player1_name, as_of),
+        get_player_stats(player2_name, as_of),
+        calculate_h2h_winrate(player1_name, player2_name, as_of),
+        calculate_h2h_winrate(player2_name, player1_name, as_of),
+    )
+    return round(p1_prob, 4), round(p2_prob, 4)
+
+
+def _predict(player1_name, player2_name, store=None):
+    if store is None:
+        # active-pool matchups are an array read when the matrix is up to date
+        matrix = get_win_matrix()
+        cached = matrix.lookup(player1_name, player2_name) if matrix else None
+        if cached is not None:
+            return cached
+
+    # both orientations are scored in one model call and averaged
+    scorer = get_resources().scorer
+    if store is None:
+        p1_prob, p2_prob = scorer.predict(player1_name, player2_name)
+    else:
+        p1 = store.player_stats(player1_name)
+        p2 = store.player_stats(player2_name)
+        p1_prob, p2_prob = scorer.predict_stats(
+            p1, p2,
+            store.head_to_head(player1_name, player2_name),
+            store.head_to_head(player2_name, player1_name),
+        )
 
     return round(p1_prob, 4), round(p2_prob, 4)
 
 
+def _diff_frame(values_a, values_b, hand_a, hand_b, known_hands, h2h):
+    """Model features of players a against players b from their stats rows (NUMERIC_FIELDS first)."""
+    def column(values, field):
+        return values[:, NUMERIC_FIELDS.index(field)]
+
+    return pd.DataFrame({
+        'ranking_diff': column(values_b, "rank") - column(values_a, "rank"),
+        'rank_points_diff': column(values_a, "rank_points") - column(values_b, "rank_points"),
+        'age_diff': column(values_a, "age") - column(values_b, "age"),
+        'height_diff': column(values_a, "height") - column(values_b, "height"),
+        'same_hand': ((hand_a == hand_b) & known_hands).astype(int),
+        'hand_matchup': hand_a + "_" + hand_b,
+        'h2h_winrate': h2h,
+        'recent_winrate_diff': column(values_a, "recent_winrate") - column(values_b, "recent_winrate"),
+    })[features]
+
+
+def _feature_frame(a, b):
+    """Vectorized build_features for the players at index rows a against rows b."""
+    resources = get_resources()
+    player_index, h2h_index = resources.player_index, resources.h2h_index
+    known_hands = (player_index.hand_codes[a] >= 0) & (player_index.hand_codes[b] >= 0)
+    return _diff_frame(player_index.values[a], player_index.values[b],
+                       player_index.hand_labels(a), player_index.hand_labels(b),
+                       known_hands, h2h_index.winrate_rows(a, b))
+
+
+def _as_of_feature_frames(a, b, as_of):
+    """_feature_frame of a against b and of b against a, as of the dates (scalar or one per pair)."""
+    resources = get_resources()
+    ids_a, ids_b = resources.player_index.ids[a], resources.player_index.ids[b]
+    index = resources.as_of
+    values_a, codes_a = index.stats_rows(ids_a, as_of)
+    values_b, codes_b = index.stats_rows(ids_b, as_of)
+    hand_a, hand_b = index.hand_labels(codes_a), index.hand_labels(codes_b)
+    known_hands = (codes_a >= 0) & (codes_b >= 0)
+    return pd.concat([
+        _diff_frame(values_a, values_b, hand_a, hand_b, known_hands, index.h2h_winrates(ids_a, ids_b, as_of)),
+        _diff_frame(values_b, values_a, hand_b, hand_a, known_hands, index.h2h_winrates(ids_b, ids_a, as_of)),
+    ], ignore_index=True)
+
+
+def predict_win_probability_batch(pairs, as_of=None):
+    """
+    Score many matchups with one model call.
+    pairs: list / array of (player1, player2) names.
+    as_of: optional date, or one date per pair, see predict_win_probability; the
+    as-of lookups are vectorized too, for historical replays.
+    Returns an (n, 2) array of [player1 prob, player2 prob], each row averaged over
+    both orientations exactly like predict_win_probability.
+    """
+    pairs = np.asarray(pairs, dtype=object).reshape(-1, 2)
+    n = len(pairs)
+    if n == 0:
+        return np.empty((0, 2))
+
+    resources = get_resources()
+    player_index = resources.player_index
+    a = player_index.positions(pairs[:, 0].tolist())
+    b = player_index.positions(pairs[:, 1].tolist())
+
+    # rows 0..n-1 score p1 vs p2, rows n..2n-1 score p2 vs p1
+    if as_of is None:
+        X = pd.concat([_feature_frame(a, b), _feature_frame(b, a)], ignore_index=True)
+    else:
+        X = _as_of_feature_frames(a, b, as_of)
+    proba = resources.model.predict_proba(X)[:, 1]
+
+    p1_prob = (proba[:n] + (1 - proba[n:])) / 2
+    p2_prob = 1 - p1_prob
+    return np.column_stack([p1_prob.round(4), p2_prob.round(4)])
+
+
 
 
 if __name__ == "__main__":
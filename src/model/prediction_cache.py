@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of match predictions with a time-to-live.
+
+    Entries are keyed by (player, player, model hash, data hash) with the two
+    players sorted, so A vs B and B vs A share one entry. When the version passed
+    in changes (the model or the feature dataset was rebuilt), every entry of the
+    previous version is dropped.
+    """
+
+    def __init__(self, maxsize=10000, ttl=24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires at, (low player prob, high player prob))
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(player1_name, player2_name, version):
+        """Order-normalized key, and whether the players were swapped to build it."""
+        swapped = player2_name < player1_name
+        low, high = (player2_name, player1_name) if swapped else (player1_name, player2_name)
+        return (low, high, version["model_sha256"], version["data_sha256"]), swapped
+
+    def _set_version(self, version):
+        if version != self._version:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._version = version
+
+    def get(self, player1_name, player2_name, version):
+        """(player1 prob, player2 prob), or None on a miss."""
+        key, swapped = self.key(player1_name, player2_name, version)
+        with self._lock:
+            self._set_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        probs = entry[1]
+        return probs[::-1] if swapped else probs
+
+    def put(self, player1_name, player2_name, version, probs):
+        key, swapped = self.key(player1_name, player2_name, version)
+        probs = tuple(probs[::-1]) if swapped else tuple(probs)
+        with self._lock:
+            self._set_version(version)
+            self._entries[key] = (time.monotonic() + self.ttl, probs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, player1_name, player2_name, version, compute):
+        """Cached result, or compute(player1_name, player2_name) stored for next time."""
+        probs = self.get(player1_name, player2_name, version)
+        if probs is None:
+            probs = compute(player1_name, player2_name)
+            self.put(player1_name, player2_name, version, probs)
+        return probs
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,185 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+ROUND_NAMES = {128: "R128", 64: "R64", 32: "R32", 16: "R16", 8: "QF", 4: "SF", 2: "F", 1: "W"}
+
+
+def round_names(draw_size):
+    """Columns of the result: every round reached, from the first round to 'W' (title)."""
+    names = []
+    size = draw_size
+    while size >= 1:
+        names.append(ROUND_NAMES.get(size, f"R{size}"))
+        size //= 2
+    return names
+
+
+def seed_positions(draw_size):
+    """
+    Seed line of every slot of a standard bracket: 1 and 2 can only meet in the
+    final, 1-4 in the semi-finals, ... e.g. 8 -> [1, 8, 4, 5, 2, 7, 3, 6].
+    """
+    order = [1]
+    while len(order) < draw_size:
+        n = len(order) * 2
+        order = [s for seed in order for s in (seed, n + 1 - seed)]
+    return order
+
+
+def build_draw(players, draw_size=None, seeds=None, rng=None):
+    """
+    Place players into a bracket.
+
+    players:   every player in the draw
+    draw_size: 32 / 64 / 128 ... (default: smallest power of two that fits)
+    seeds:     seeded players, best first; they take the standard seed lines
+    Byes (None) go to the top seeds' first-round slots, the unseeded players
+    are shuffled into the remaining slots.
+    """
+    players = list(players)
+    seeds = [p for p in (seeds or []) if p in players]
+    draw_size = draw_size or 1 << max(len(players) - 1, 1).bit_length()
+    if draw_size & (draw_size - 1) or len(players) > draw_size:
+        raise ValueError(f"draw_size must be a power of two >= {len(players)}, got {draw_size}")
+    rng = np.random.default_rng(rng)
+
+    line_to_slot = {line: slot for slot, line in enumerate(seed_positions(draw_size))}
+    draw = [None] * draw_size
+    for line, player in enumerate(seeds, start=1):
+        draw[line_to_slot[line]] = player
+
+    # byes face the best seed lines: line k meets line draw_size + 1 - k in round one
+    byes = draw_size - len(players)
+    bye_slots = {line_to_slot[draw_size + 1 - line] for line in range(1, byes + 1)}
+
+    open_slots = [slot for slot in range(draw_size) if draw[slot] is None and slot not in bye_slots]
+    unseeded = [p for p in players if p not in set(seeds)]
+    for slot, player in zip(open_slots, rng.permutation(len(unseeded))):
+        draw[slot] = unseeded[player]
+    return draw
+
+
+def pairwise_matrix(players):
+    """
+    P[i, j] = probability that players[i] beats players[j], from the precomputed win
+    matrix when it covers every player, otherwise from one batched model call.
+    """
+    from src.model.predict_win_probability import get_win_matrix, predict_win_probability_batch
+
+    n = len(players)
+    matrix = get_win_matrix()
+    if matrix and all(p in matrix.position for p in players):
+        rows = [matrix.position[p] for p in players]
+        P = np.asarray(matrix.matrix[np.ix_(rows, rows)], dtype=np.float64)
+    else:
+        P = np.full((n, n), 0.5)
+        i, j = np.triu_indices(n, k=1)
+        names = np.array(players, dtype=object)
+        probs = predict_win_probability_batch(np.column_stack([names[i], names[j]]))
+        P[i, j] = probs[:, 0]
+        P[j, i] = probs[:, 1]
+    np.fill_diagonal(P, 0.5)
+    return P
+
+
+def _simulate_counts(slots, P, n_sims, seed, chunk_size=20000):
+    """
+    Count how often each player index reaches every round over n_sims tournaments.
+    All simulations of a chunk advance one round at a time as array operations.
+    """
+    rng = np.random.default_rng(seed)
+    n_players = P.shape[0]
+    n_rounds = int(np.log2(len(slots))) + 1
+    counts = np.zeros((n_rounds, n_players), dtype=np.int64)
+
+    done = 0
+    while done < n_sims:
+        sims = min(chunk_size, n_sims - done)
+        current = np.broadcast_to(slots, (sims, len(slots)))
+        counts[0] += np.bincount(current.ravel(), minlength=n_players)
+        for r in range(1, n_rounds):
+            a, b = current[:, 0::2], current[:, 1::2]
+            a_wins = rng.random(a.shape, dtype=np.float32) < P[a, b]
+            current = np.where(a_wins, a, b)
+            counts[r] += np.bincount(current.ravel(), minlength=n_players)
+        done += sims
+    return counts
+
+
+def _simulate_worker(args):
+    return _simulate_counts(*args)
+
+
+def simulate_tournament(draw, n_sims=100000, P=None, seed=None, workers=1):
+    """
+    Monte Carlo simulation of a bracket.
+
+    draw:    list of player names in bracket order (None = bye), length a power of two
+    P:       optional pairwise matrix over the draw's players (in draw order),
+             computed with pairwise_matrix() otherwise
+    workers: processes to split the simulations over
+
+    Returns a DataFrame (one row per player) with the probability of reaching
+    every round, the last column 'W' being the title, sorted by title odds.
+    """
+    draw_size = len(draw)
+    if draw_size < 2 or draw_size & (draw_size - 1):
+        raise ValueError(f"Draw size must be a power of two, got {draw_size}")
+
+    players = [p for p in draw if p is not None]
+    if P is None:
+        P = pairwise_matrix(players)
+
+    # one extra index for byes: every player beats a bye
+    bye = len(players)
+    P_full = np.full((bye + 1, bye + 1), 0.5, dtype=np.float32)
+    P_full[:bye, :bye] = P
+    P_full[:bye, bye] = 1.0
+    P_full[bye, :bye] = 0.0
+    position = {name: i for i, name in enumerate(players)}
+    slots = np.array([position[p] if p is not None else bye for p in draw], dtype=np.int16)
+
+    seeds = np.random.SeedSequence(seed).spawn(max(workers, 1))
+    if workers <= 1:
+        counts = _simulate_counts(slots, P_full, n_sims, seeds[0])
+    else:
+        shares = [n_sims // workers + (k < n_sims % workers) for k in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = sum(pool.map(_simulate_worker, [(slots, P_full, s, sd) for s, sd in zip(shares, seeds)]))
+
+    result = pd.DataFrame(counts[:, :bye].T / n_sims, index=players, columns=round_names(draw_size))
+    result.index.name = "player"
+    return result.sort_values(["W", result.columns[-2]], ascending=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a tournament draw of the top ranked active players")
+    parser.add_argument("--draw-size", type=int, default=128)
+    parser.add_argument("--seeds", type=int, default=32)
+    parser.add_argument("--sims", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    from src.model.predict_win_probability import df, player_index
+    from src.model.win_matrix import active_players
+
+    pool = active_players(df)
+    ranks = player_index.column("rank", player_index.positions(pool))
+    field = [pool[i] for i in np.argsort(ranks, kind="stable")[:args.draw_size]]
+
+    draw = build_draw(field, args.draw_size, seeds=field[:args.seeds], rng=0)
+    start = time.perf_counter()
+    P = pairwise_matrix([p for p in draw if p is not None])
+    built = time.perf_counter()
+    result = simulate_tournament(draw, args.sims, P=P, seed=0, workers=args.workers)
+    finished = time.perf_counter()
+    print(result.head(10).round(4).to_string())
+    print(f"Pairwise matrix {built - start:.2f}s, {args.sims} simulations {finished - built:.2f}s")
@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+from src.model.training_data import (CAT_FEATURES, FEATURES, TARGET, TRAINING_DATA_PATH, build_symmetric_frame,
+                                     count_training_rows, iter_symmetric_batches, load_training_frame)
+from src.model.win_matrix import file_sha256
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "model", "catboost_model.cbm")
+TRAINING_DIR = os.path.join(BASE_DIR, "output", "training")
+TRIALS_PATH = os.path.join(TRAINING_DIR, "trials.jsonl")
+PARAMS_PATH = os.path.join(TRAINING_DIR, "best_params.json")
+
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+
+# feature borders of the cached quantized pool, fixed so the pool can be reused by
+# every trial (border_count is not searched)
+BORDER_COUNT = 110
+
+# result of the earlier tuning run, used when no search has been run yet
+DEFAULT_PARAMS = {
+    "iterations": 500,
+    "learning_rate": 0.2717659141225842,
+    "depth": 10,
+    "l2_leaf_reg": 3.1545772618914834,
+    "random_strength": 0.041159733940320326,
+    "bagging_temperature": 0.994656919578217,
+}
+
+# param -> (low, high, log scale) sampled uniformly; depth is an integer
+SEARCH_SPACE = {
+    "learning_rate": (0.02, 0.3, True),
+    "depth": (4, 10, False),
+    "l2_leaf_reg": (1.0, 10.0, True),
+    "random_strength": (0.01, 2.0, True),
+    "bagging_temperature": (0.0, 1.0, False),
+}
+
+
+# ----------------------------------------------------------
+# Data
+# ----------------------------------------------------------
+def split_positions(n):
+    """(train, test) row positions of the symmetric frame of n matches, same split every run."""
+    from sklearn.model_selection import train_test_split
+
+    labels = np.repeat([1, 0], n)
+    return train_test_split(np.arange(2 * n), test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=labels)
+
+
+def split_frame(data_path=TRAINING_DATA_PATH):
+    """(X_train, X_test, y_train, y_test) of the symmetric training data, same split every run."""
+    final_df = build_symmetric_frame(load_training_frame(data_path))
+    train, test = split_positions(len(final_df) // 2)
+    X, y = final_df[FEATURES], final_df[TARGET]
+    return X.iloc[train], X.iloc[test], y.iloc[train], y.iloc[test]
+
+
+def pool_key(data_path=TRAINING_DATA_PATH, border_count=BORDER_COUNT, streamed=False):
+    """Everything the quantized training pool depends on."""
+    key = {"data_sha256": file_sha256(data_path), "features": FEATURES, "border_count": border_count,
+           "test_size": TEST_SIZE, "split_seed": SPLIT_SEED}
+    if streamed:
+        # same rows as the in-memory pool but in file order, so models differ slightly
+        key["streamed"] = True
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _stream_pools(data_path, train_path, batch_rows):
+    """
+    Train rows of the split are written batch by batch to a CatBoost TSV file that
+    CatBoost reads itself, the test rows are kept as a frame. Only one batch of the
+    feature dataset is in memory while preparing.
+    """
+    import pandas as pd
+    from catboost import Pool
+
+    n = count_training_rows(data_path)
+    is_test = np.zeros(2 * n, dtype=bool)
+    is_test[split_positions(n)[1]] = True
+
+    tsv_path, cd_path = train_path + ".tsv", train_path + ".cd"
+    with open(cd_path, "w") as f:
+        f.write("0\tLabel\n")
+        for i, name in enumerate(FEATURES, start=1):
+            f.write(f"{i}\t{'Categ' if name in CAT_FEATURES else 'Num'}\t{name}\n")
+
+    tests = []
+    with open(tsv_path, "w") as f:
+        for batch in iter_symmetric_batches(data_path, batch_rows):
+            test = is_test[batch["position"].to_numpy()]
+            batch[~test][[TARGET] + FEATURES].to_csv(f, sep="\t", header=False, index=False)
+            tests.append(batch[test][FEATURES + [TARGET]])
+    test = pd.concat(tests, ignore_index=True)
+    train_pool = Pool(tsv_path, column_description=cd_path)
+    os.remove(tsv_path)
+    os.remove(cd_path)
+    return train_pool, test
+
+
+def load_pools(data_path=TRAINING_DATA_PATH, cache_dir=TRAINING_DIR, border_count=BORDER_COUNT, batch_rows=None):
+    """
+    (quantized train pool, test pool). The quantized train pool is saved to cache_dir
+    on first use and loaded from there while the data and settings are unchanged, so
+    repeated runs skip quantization. The test pool stays raw: CatBoost scores a raw
+    eval set exactly like the training run on unquantized data does.
+    With batch_rows the feature dataset is streamed from disk in batches of that many
+    rows instead of being loaded whole (see _stream_pools).
+    """
+    import pandas as pd
+    from catboost import Pool
+
+    key = pool_key(data_path, border_count, streamed=batch_rows is not None)
+    train_path = os.path.join(cache_dir, f"train_{key}.quantized")
+    test_path = os.path.join(cache_dir, f"test_{key}.pkl")
+
+    if os.path.exists(train_path) and os.path.exists(test_path):
+        test = pd.read_pickle(test_path)
+        return Pool("quantized://" + train_path), Pool(test[FEATURES], test[TARGET], cat_features=CAT_FEATURES)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if batch_rows is None:
+        X_train, X_test, y_train, y_test = split_frame(data_path)
+        train_pool = Pool(X_train, y_train, cat_features=CAT_FEATURES)
+        del X_train, y_train
+        test = X_test.assign(**{TARGET: y_test})
+    else:
+        train_pool, test = _stream_pools(data_path, train_path, batch_rows)
+    train_pool.quantize(border_count=border_count)
+    train_pool.save(train_path)
+    test.to_pickle(test_path)
+    return train_pool, Pool(test[FEATURES], test[TARGET], cat_features=CAT_FEATURES)
+
+
+# ----------------------------------------------------------
+# Training
+# ----------------------------------------------------------
+def make_model(params, thread_count=-1, early_stopping_rounds=30, verbose=False, eval_metric="Accuracy"):
+    from catboost import CatBoostClassifier
+    return CatBoostClassifier(
+        **params,
+        border_count=BORDER_COUNT,
+        loss_function="Logloss",
+        eval_metric=eval_metric,
+        early_stopping_rounds=early_stopping_rounds,
+        random_seed=42,
+        verbose=verbose,
+        task_type="CPU",
+        thread_count=thread_count,
+    )
+
+
+def train(params=None, thread_count=-1, model_path=MODEL_PATH, data_path=TRAINING_DATA_PATH, cache_dir=TRAINING_DIR,
+          batch_rows=None):
+    """Fit the model with `params` (default: best searched params, else DEFAULT_PARAMS) and save it."""
+    if params is None:
+        params = load_best_params(cache_dir) or DEFAULT_PARAMS
+    start = time.perf_counter()
+    train_pool, test_pool = load_pools(data_path, cache_dir, batch_rows=batch_rows)
+    loaded = time.perf_counter()
+    model = make_model(params, thread_count, verbose=50)
+    model.fit(train_pool, eval_set=test_pool)
+    model.save_model(model_path)
+    print(f"⏱️ pools {loaded - start:.1f}s, fit {time.perf_counter() - loaded:.1f}s "
+          f"({model.tree_count_} trees, thread_count={thread_count})")
+    print(f"✅ Model saved to {model_path}")
+    return model
+
+
+# ----------------------------------------------------------
+# Hyperparameter search
+# ----------------------------------------------------------
+def sample_params(rng, iterations):
+    params = {"iterations": iterations}
+    for name, (low, high, log) in SEARCH_SPACE.items():
+        value = np.exp(rng.uniform(np.log(low), np.log(high))) if log else rng.uniform(low, high)
+        params[name] = int(round(value)) if name == "depth" else float(value)
+    return params
+
+
+def params_id(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _run_trial(args):
+    """Fit one trial on the cached pools; runs in a worker process."""
+    params, thread_count, data_path, cache_dir, early_stopping_rounds, batch_rows = args
+    start = time.perf_counter()
+    train_pool, test_pool = load_pools(data_path, cache_dir, batch_rows=batch_rows)
+    model = make_model(params, thread_count, early_stopping_rounds, eval_metric="Logloss")
+    model.set_params(custom_metric=["Accuracy"])
+    model.fit(train_pool, eval_set=test_pool)
+    scores = model.get_best_score()["validation"]
+    return {
+        "id": params_id(params),
+        "params": params,
+        "logloss": scores["Logloss"],
+        "accuracy": scores["Accuracy"],
+        "best_iteration": model.get_best_iteration(),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def load_trials(cache_dir=TRAINING_DIR, data_key=None):
+    """Persisted trials (optionally only those run on the pool `data_key`)."""
+    path = os.path.join(cache_dir, os.path.basename(TRIALS_PATH))
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        trials = [json.loads(line) for line in f if line.strip()]
+    return [t for t in trials if data_key is None or t.get("data_key") == data_key]
+
+
+def load_best_params(cache_dir=TRAINING_DIR):
+    path = os.path.join(cache_dir, os.path.basename(PARAMS_PATH))
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["params"]
+
+
+def search(n_trials=20, workers=None, threads=None, iterations=1000, early_stopping_rounds=50, seed=0,
+           data_path=TRAINING_DATA_PATH, cache_dir=TRAINING_DIR, batch_rows=None):
+    """
+    Random search over SEARCH_SPACE. Trials run on a pool of `workers` processes with
+    threads // workers CatBoost threads each, stop early on the test logloss and are
+    appended to trials.jsonl as they finish. Trials already in the file for the same
+    data are not run again, so an interrupted search resumes where it stopped.
+    The best trial's params (with iterations set to its best iteration) are written
+    to best_params.json. Returns the best trial.
+    """
+    threads = os.cpu_count() if threads is None else threads
+    workers = min(n_trials, threads) if workers is None else workers
+    thread_count = max(1, threads // max(workers, 1))
+
+    # quantize once up front, the workers only load the cached pools
+    load_pools(data_path, cache_dir, batch_rows=batch_rows)
+    data_key = pool_key(data_path, streamed=batch_rows is not None)
+    done = {t["id"]: t for t in load_trials(cache_dir, data_key)}
+
+    rng = np.random.default_rng(seed)
+    candidates = [sample_params(rng, iterations) for _ in range(n_trials)]
+    todo = [p for p in candidates if params_id(p) not in done]
+    print(f"🔍 {len(candidates)} trials ({len(candidates) - len(todo)} already done), "
+          f"{workers} workers x {thread_count} threads")
+
+    def record(trial):
+        trial["data_key"] = data_key
+        with open(os.path.join(cache_dir, os.path.basename(TRIALS_PATH)), "a") as f:
+            f.write(json.dumps(trial) + "\n")
+        done[trial["id"]] = trial
+        print(f"  trial {trial['id']}: logloss {trial['logloss']:.4f}, accuracy {trial['accuracy']:.4f}, "
+              f"{trial['best_iteration']} iterations, {trial['seconds']}s")
+
+    args = [(p, thread_count, data_path, cache_dir, early_stopping_rounds, batch_rows) for p in todo]
+    if workers <= 1:
+        for a in args:
+            record(_run_trial(a))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(_run_trial, a) for a in args]):
+                record(future.result())
+
+    best = min((done[params_id(p)] for p in candidates), key=lambda t: t["logloss"])
+    params = dict(best["params"], iterations=best["best_iteration"] + 1)
+    path = os.path.join(cache_dir, os.path.basename(PARAMS_PATH))
+    with open(path, "w") as f:
+        json.dump({"params": params, "trial": best}, f, indent=2)
+    print(f"🏆 Best trial {best['id']}: logloss {best['logloss']:.4f}, accuracy {best['accuracy']:.4f} -> {path}")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the match model on CPU, optionally after a hyperparameter search")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="CPU threads to use in total")
+    parser.add_argument("--search", type=int, default=0, metavar="TRIALS",
+                        help="run a random search with this many trials first")
+    parser.add_argument("--workers", type=int, help="search trials run in parallel (default: one per thread)")
+    parser.add_argument("--iterations", type=int, default=1000, help="max iterations of a search trial")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the sampled search trials")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--batch-rows", type=int, metavar="ROWS",
+                        help="stream the feature dataset from disk in batches of this many rows")
+    args = parser.parse_args()
+
+    if args.search:
+        search(args.search, args.workers, args.threads, args.iterations, seed=args.seed, batch_rows=args.batch_rows)
+    train(thread_count=args.threads, model_path=args.model_path, batch_rows=args.batch_rows)
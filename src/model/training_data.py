@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINING_DATA_PATH = os.path.join(BASE_DIR, "output", "feature_dataset.csv")
+
+FEATURES = [
+    'ranking_diff', 'rank_points_diff',
+    'age_diff', 'height_diff',
+    'same_hand', 'hand_matchup',
+    'h2h_winrate', 'recent_winrate_diff'
+]
+CAT_FEATURES = ['hand_matchup']
+TARGET = 'label'
+
+# winner - loser differences: negated when the match is seen from the loser's side;
+# the other numeric features are kept as they are
+ANTISYMMETRIC_FEATURES = [
+    'ranking_diff', 'rank_points_diff',
+    'age_diff', 'height_diff',
+    'recent_winrate_diff'
+]
+NUMERIC_FEATURES = [f for f in FEATURES if f not in CAT_FEATURES]
+
+# matches without these are not used for training
+REQUIRED_COLUMNS = [
+    'winner_rank', 'loser_rank',
+    'winner_rank_points', 'loser_rank_points',
+    'winner_age', 'loser_age',
+    'winner_ht', 'loser_ht',
+    'winner_hand', 'loser_hand'
+]
+
+# columns of the feature dataset the features are computed from
+SOURCE_COLUMNS = REQUIRED_COLUMNS + ['h2h_winrate', 'winner_recent_winrate', 'loser_recent_winrate']
+
+# rows per batch when streaming the feature dataset
+BATCH_ROWS = 20_000
+
+
+def add_training_features(df):
+    """Drop matches without complete pre-match info and add the model features (winner's side)."""
+    df = df.dropna(subset=REQUIRED_COLUMNS).copy()
+
+    # Create features based only on pre-match information
+    df['ranking_diff'] = df['loser_rank'] - df['winner_rank']
+    df['rank_points_diff'] = df['winner_rank_points'] - df['loser_rank_points']
+    df['age_diff'] = df['winner_age'] - df['loser_age']
+    df['height_diff'] = df['winner_ht'] - df['loser_ht']
+    df['same_hand'] = (df['winner_hand'] == df['loser_hand']).astype(int)
+    df['hand_matchup'] = df['winner_hand'].fillna('U') + '_' + df['loser_hand'].fillna('U')
+    df['recent_winrate_diff'] = df['winner_recent_winrate'] - df['loser_recent_winrate']
+    df['label'] = 1
+    return df
+
+
+def load_training_frame(path=TRAINING_DATA_PATH, extra_columns=()):
+    """
+    Matches of the feature dataset with complete pre-match info and the model features
+    (winner's side). Only the columns the features need are read, plus `extra_columns`.
+    """
+    df = pd.read_csv(path, usecols=SOURCE_COLUMNS + list(extra_columns))
+    return add_training_features(df)
+
+
+def flip_hand_matchup(values):
+    """'R_L' -> 'L_R' as a categorical: each category is reversed once, rows go through a code lookup."""
+    values = pd.Categorical(values)
+    reversed_categories = ['_'.join(reversed(c.split('_'))) for c in values.categories]
+    categories = values.categories.union(reversed_categories)
+    codes = categories.get_indexer(values.categories)
+    flipped = categories.get_indexer(reversed_categories)
+    # lookup tables: old code -> code of the category / of its reverse (-1 stays missing)
+    same = np.append(codes, -1)[values.codes]
+    swapped = np.append(flipped, -1)[values.codes]
+    return (pd.Categorical.from_codes(same, categories),
+            pd.Categorical.from_codes(swapped, categories))
+
+
+def build_symmetric_frame(df, extra_columns=()):
+    """
+    Every match twice: as played (label 1, first len(df) rows) and from the loser's side
+    (label 0, same order). The numeric features are written into one preallocated float32
+    block (the precision CatBoost trains on) and the loser's side is a negated copy of
+    ANTISYMMETRIC_FEATURES; hand_matchup is reversed through a category lookup.
+    `extra_columns` of df are repeated for both halves.
+    """
+    n = len(df)
+    values = np.empty((2 * n, len(NUMERIC_FEATURES)), dtype=np.float32)
+    values[:n] = df[NUMERIC_FEATURES].to_numpy(dtype=np.float32)
+    values[n:] = values[:n]
+    antisymmetric = [NUMERIC_FEATURES.index(f) for f in ANTISYMMETRIC_FEATURES]
+    values[n:, antisymmetric] *= -1
+
+    frame = pd.DataFrame(values, columns=NUMERIC_FEATURES, copy=False)
+    played, flipped = flip_hand_matchup(df['hand_matchup'])
+    frame.insert(FEATURES.index('hand_matchup'), 'hand_matchup',
+                 pd.Categorical.from_codes(np.concatenate([played.codes, flipped.codes]), played.categories))
+    frame[TARGET] = np.repeat(np.array([1, 0], dtype=np.int8), n)
+    for column in extra_columns:
+        column_values = df[column].to_numpy()
+        frame[column] = np.concatenate([column_values, column_values])
+    return frame
+
+
+def count_training_rows(path=TRAINING_DATA_PATH):
+    """Matches of the feature dataset that load_training_frame keeps, without building any features."""
+    df = pd.read_csv(path, usecols=REQUIRED_COLUMNS)
+    return int(df.notna().all(axis=1).sum())
+
+
+def iter_symmetric_batches(path=TRAINING_DATA_PATH, batch_rows=BATCH_ROWS, extra_columns=()):
+    """
+    build_symmetric_frame over batches of `batch_rows` rows of the feature dataset read
+    from disk, so only one batch is in memory at a time. Each batch also gets a
+    'position' column: the row's position in build_symmetric_frame of the whole dataset.
+    """
+    n = count_training_rows(path)
+    offset = 0
+    reader = pd.read_csv(path, usecols=SOURCE_COLUMNS + list(extra_columns), chunksize=batch_rows)
+    for chunk in reader:
+        df = add_training_features(chunk)
+        if not len(df):
+            continue
+        batch = build_symmetric_frame(df, extra_columns)
+        rows = np.arange(offset, offset + len(df))
+        batch['position'] = np.concatenate([rows, rows + n])
+        offset += len(df)
+        yield batch
@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "model", "catboost_model.cbm")
+DATA_PATH = os.path.join(BASE_DIR, "output", "feature_dataset_light.csv")
+MATRIX_DIR = os.path.join(BASE_DIR, "output", "win_matrix")
+MATRIX_PATH = os.path.join(MATRIX_DIR, "win_matrix.npy")
+INDEX_PATH = os.path.join(MATRIX_DIR, "win_matrix.json")
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def current_version(model_path=MODEL_PATH, data_path=DATA_PATH):
+    return {"model_sha256": file_sha256(model_path), "data_sha256": file_sha256(data_path)}
+
+
+class WinMatrix:
+    """
+    matrix[i, j] = probability that players[i] beats players[j] (memory mapped, read only).
+    """
+
+    def __init__(self, matrix, players, version):
+        self.matrix = matrix
+        self.players = players
+        self.position = {name: i for i, name in enumerate(players)}
+        self.version = version
+
+    def lookup(self, player1_name, player2_name):
+        """(player1 prob, player2 prob), or None if a player is not in the pool."""
+        i = self.position.get(player1_name)
+        j = self.position.get(player2_name)
+        if i is None or j is None:
+            return None
+        # stored as float32, round back to the 4 decimals predict_win_probability returns
+        p1_prob = round(float(self.matrix[i, j]), 4)
+        return p1_prob, round(1 - p1_prob, 4)
+
+
+def load_matrix(matrix_dir=MATRIX_DIR, check_version=True):
+    """
+    Open the matrix built by build_matrix. Returns None if it does not exist or
+    (with check_version) if it was built from another model / feature dataset.
+    """
+    index_path = os.path.join(matrix_dir, os.path.basename(INDEX_PATH))
+    matrix_path = os.path.join(matrix_dir, os.path.basename(MATRIX_PATH))
+    if not (os.path.exists(index_path) and os.path.exists(matrix_path)):
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    if check_version and index["version"] != current_version():
+        return None
+    matrix = np.load(matrix_path, mmap_mode="r")
+    return WinMatrix(matrix, index["players"], index["version"])
+
+
+# ----------------------------------------------------------
+# Build
+# ----------------------------------------------------------
+def active_players(df, season=None):
+    """Players with a match in `season` (default: the latest season in the data)."""
+    years = df["tourney_date"].astype(str).str[:4].astype(int)
+    season = years.max() if season is None else season
+    current = df[years == season]
+    return sorted(set(current["winner_name"]).union(set(current["loser_name"])))
+
+
+def player_fingerprints(players, df, player_index):
+    """Everything a player's row depends on: their stats and their number of matches."""
+    counts = df["winner_name"].value_counts().add(df["loser_name"].value_counts(), fill_value=0)
+    fingerprints = {}
+    for name in players:
+        stats = player_index.stats(name)
+        stats["matches"] = int(counts.get(name, 0))
+        fingerprints[name] = json.dumps(stats, sort_keys=True, default=str)
+    return fingerprints
+
+
+def _score_pairs(pairs):
+    from src.model.predict_win_probability import predict_win_probability_batch
+    return predict_win_probability_batch(pairs)[:, 0]
+
+
+def score_pairs(pairs, workers=1, chunk_size=20000):
+    """
+    P(first beats second) for every pair. The pairs are split into chunks scored on
+    a pool of `workers` processes; a single chunk is scored in-process (CatBoost
+    still uses all cores for it).
+    """
+    if len(pairs) == 0:
+        return np.empty(0)
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    if workers <= 1 or len(chunks) == 1:
+        return _score_pairs(pairs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(_score_pairs, chunks)))
+
+
+def build_matrix(season=None, workers=None, matrix_dir=MATRIX_DIR, full=False):
+    """
+    Compute the N x N win-probability matrix of the active player pool.
+    Unless `full`, an existing matrix built with the same model is reused and only
+    pairs involving new players or players whose stats changed are rescored.
+    """
+    from src.model.predict_win_probability import df, player_index
+
+    workers = os.cpu_count() if workers is None else workers
+    os.makedirs(matrix_dir, exist_ok=True)
+    index_path = os.path.join(matrix_dir, os.path.basename(INDEX_PATH))
+    matrix_path = os.path.join(matrix_dir, os.path.basename(MATRIX_PATH))
+
+    players = active_players(df, season)
+    version = current_version()
+    fingerprints = player_fingerprints(players, df, player_index)
+    n = len(players)
+    matrix = np.full((n, n), 0.5, dtype=np.float32)
+
+    previous = None
+    if not full and os.path.exists(index_path) and os.path.exists(matrix_path):
+        with open(index_path) as f:
+            previous = json.load(f)
+        if previous["version"]["model_sha256"] != version["model_sha256"]:
+            previous = None
+
+    if previous is None:
+        changed = np.ones(n, dtype=bool)
+    else:
+        old_matrix = np.load(matrix_path)
+        old_position = {name: i for i, name in enumerate(previous["players"])}
+        kept = [i for i, name in enumerate(players)
+                if name in old_position and previous["fingerprints"].get(name) == fingerprints[name]]
+        old_kept = [old_position[players[i]] for i in kept]
+        matrix[np.ix_(kept, kept)] = old_matrix[np.ix_(old_kept, old_kept)]
+        changed = np.ones(n, dtype=bool)
+        changed[kept] = False
+
+    # rescore every unordered pair (i < j) with at least one changed player
+    i, j = np.triu_indices(n, k=1)
+    todo = changed[i] | changed[j]
+    i, j = i[todo], j[todo]
+    names = np.array(players, dtype=object)
+    probs = score_pairs(np.column_stack([names[i], names[j]]), workers)
+    matrix[i, j] = probs
+    matrix[j, i] = np.round(1 - probs, 4)
+
+    np.save(matrix_path, matrix)
+    with open(index_path, "w") as f:
+        json.dump({"version": version, "players": players, "fingerprints": fingerprints}, f)
+    print(f"✅ Win matrix: {n} players, rescored {len(i)} of {n * (n - 1) // 2} pairs "
+          f"({int(changed.sum())} changed players) -> {matrix_path}")
+    return matrix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the all-pairs win-probability matrix")
+    parser.add_argument("--season", type=int, default=None, help="season of the active pool (default: latest)")
+    parser.add_argument("--workers", type=int, default=None, help="processes used to score pairs (default: all cores)")
+    parser.add_argument("--full", action="store_true", help="rescore every pair")
+    args = parser.parse_args()
+
+    build_matrix(args.season, args.workers, full=args.full)
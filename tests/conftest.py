@@ -0,0 +1,30 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.data_engineer.feature_pipeline import run
+from src.data_engineer.match_store import DATA_DIR
+
+# a few seasons of real matches: enough for carried state, pairs that met and every hand
+YEARS = (2022, 2023, 2024)
+
+
+@pytest.fixture(scope='session')
+def data_folder(tmp_path_factory):
+    """Folder with the yearly match files of YEARS only."""
+    folder = tmp_path_factory.mktemp('data')
+    for year in YEARS:
+        shutil.copy(os.path.join(DATA_DIR, f'atp_matches_{year}.csv'), folder)
+    return str(folder)
+
+
+@pytest.fixture(scope='session')
+def output_dir(data_folder, tmp_path_factory):
+    """Folder with the light and full feature datasets built from data_folder."""
+    folder = str(tmp_path_factory.mktemp('output'))
+    run(('light', 'full'), data_folder, folder)
+    return folder
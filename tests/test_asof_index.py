@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_engineer.feature_pipeline import output_name
+from src.data_engineer.match_order import chronological_order
+from src.model.asof_index import AS_OF_FIELDS, AsOfIndex
+from src.model.loader import _load_data
+from src.model.player_index import PlayerIndex, STAT_COLUMNS
+
+
+@pytest.fixture(scope='module')
+def light(output_dir):
+    return _load_data(os.path.join(output_dir, output_name('light')))
+
+
+@pytest.fixture(scope='module')
+def index(light):
+    return AsOfIndex.from_frame(light)
+
+
+def queries(light, n=300):
+    """(player, opponent, date) of random matches, at their own date and a few days after."""
+    rng = np.random.default_rng(0)
+    rows = light.iloc[rng.integers(len(light), size=n)]
+    shift = pd.to_timedelta(rng.choice([0, 1, 7], size=n), unit='D')
+    return list(zip(rows['winner_id'].tolist(), rows['loser_id'].tolist(), rows['tourney_date'] + shift))
+
+
+def expected_stats(light, player_id, date):
+    """Stats of the player's last match (in match order) among the matches dated before `date`."""
+    before = light[light['tourney_date'] < date]
+    played = before[(before['winner_id'] == player_id) | (before['loser_id'] == player_id)]
+    if played.empty:
+        return None
+    record = played.iloc[chronological_order(played)[-1]]
+    side = 'winner' if record['winner_id'] == player_id else 'loser'
+    stats = {field: record[f'{side}_{col}'] for field, col in STAT_COLUMNS.items()}
+    stats['elo'] = record[f'{side}_elo']
+    return stats
+
+
+def test_stats_only_see_matches_before_the_date(light, index):
+    for player_id, _, date in queries(light):
+        expected = expected_stats(light, player_id, date)
+        if expected is None:
+            with pytest.raises(ValueError):
+                index.stats(player_id, date)
+            continue
+        stats = index.stats(player_id, date)
+        for field in AS_OF_FIELDS + ['hand']:
+            assert (pd.isna(stats[field]) and pd.isna(expected[field])) or stats[field] == expected[field], \
+                (player_id, date, field)
+
+
+def test_h2h_only_sees_matches_before_the_date(light, index):
+    for p1, p2, date in queries(light):
+        before = light[light['tourney_date'] < date]
+        met = before[((before['winner_id'] == p1) & (before['loser_id'] == p2))
+                     | ((before['winner_id'] == p2) & (before['loser_id'] == p1))]
+        expected = (met['winner_id'] == p1).mean() if len(met) else 0.5
+        assert index.h2h(p1, p2, date) == pytest.approx(expected, abs=1e-12)
+        assert index.h2h(p2, p1, date) == pytest.approx(1 - expected if len(met) else 0.5, abs=1e-12)
+
+
+def test_far_future_matches_latest_stats(light, index):
+    player_index = PlayerIndex.from_frame(light)
+    for i, player_id in enumerate(player_index.ids.tolist()):
+        stats = index.stats(player_id, '2100-01-01')
+        for field, expected in zip(AS_OF_FIELDS, player_index.values[i].tolist()):
+            assert (pd.isna(stats[field]) and pd.isna(expected)) or stats[field] == expected, (player_id, field)
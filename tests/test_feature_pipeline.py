@@ -0,0 +1,56 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_engineer.elo import load_ratings, ratings_path
+from src.data_engineer.feature_pipeline import PROJECTIONS, output_name, run, run_chunked
+from src.model.loader import _load_data, _load_elo
+from src.model.win_matrix import file_sha256
+
+
+def assert_same_ratings(ratings, expected):
+    """Same players with the same overall / surface ratings (slots may be numbered differently)."""
+    assert sorted(ratings.slot) == sorted(expected.slot)
+    ids = sorted(expected.slot)
+    rows = [ratings.slot[i] for i in ids]
+    expected_rows = [expected.slot[i] for i in ids]
+    np.testing.assert_array_equal(ratings.rating[rows], expected.rating[expected_rows])
+    np.testing.assert_array_equal(ratings.surface_rating[rows], expected.surface_rating[expected_rows])
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 5000])
+def test_run_chunked_matches_run(data_folder, tmp_path, chunk_rows):
+    """The chunked build's partitions, concatenated, equal the in-memory build's csv."""
+    projections = tuple(PROJECTIONS)
+    run(projections, data_folder, str(tmp_path / 'memory'))
+    run_chunked(projections, data_folder, str(tmp_path / 'chunked'), chunk_rows=chunk_rows, workers=1)
+
+    for name in projections:
+        expected = pd.read_csv(tmp_path / 'memory' / output_name(name))
+        folder = tmp_path / 'chunked' / os.path.splitext(output_name(name))[0]
+        parts = sorted(glob.glob(str(folder / 'part-*.csv')))
+        # whole yearly files stay together, so both sizes still give several chunks
+        assert len(parts) > 1
+        chunked = pd.concat([pd.read_csv(p) for p in parts], ignore_index=True)
+        pd.testing.assert_frame_equal(chunked, expected)
+
+        # both builds save the same final ratings, keyed by the (identical) csv
+        data_sha256 = file_sha256(tmp_path / 'memory' / output_name(name))
+        expected_ratings = load_ratings(str(tmp_path / 'memory' / output_name(name)), data_sha256)
+        ratings = load_ratings(str(tmp_path / 'chunked' / output_name(name)), data_sha256)
+        assert ratings is not None
+        assert_same_ratings(ratings, expected_ratings)
+
+
+def test_loader_replays_elo_without_writing(data_folder, tmp_path):
+    run(('light',), data_folder, str(tmp_path))
+    path = str(tmp_path / output_name('light'))
+    saved = load_ratings(path, file_sha256(path))
+    os.remove(ratings_path(path))
+
+    ratings = _load_elo(_load_data(path), path, file_sha256(path))
+    assert not os.path.exists(ratings_path(path))
+    assert_same_ratings(ratings, saved)
@@ -0,0 +1,89 @@
+import os
+import shutil
+
+import pandas as pd
+
+from src.data_engineer.feature_pipeline import PROJECTIONS, output_name, run
+
+from conftest import YEARS
+
+# matches of the last season dated from SPLIT_DATE on are the "new" ones, appended
+# in two steps: before SECOND_SPLIT_DATE, then the rest
+SPLIT_DATE = '20240901'
+SECOND_SPLIT_DATE = '20241001'
+
+
+def yearly_lines(data_folder, year):
+    """Header and rows of a yearly file as raw lines (so rewritten files keep their bytes)."""
+    with open(os.path.join(data_folder, f'atp_matches_{year}.csv'), encoding='utf-8') as f:
+        header, *rows = f.read().splitlines(keepends=True)
+    return header, rows
+
+
+def write_season(folder, data_folder, header, last_rows):
+    """folder with the fixture files, the last season's file holding only `last_rows`."""
+    os.makedirs(folder, exist_ok=True)
+    for year in YEARS[:-1]:
+        shutil.copy(os.path.join(data_folder, f'atp_matches_{year}.csv'), folder)
+    with open(os.path.join(folder, f'atp_matches_{YEARS[-1]}.csv'), 'w', encoding='utf-8') as f:
+        f.writelines([header] + last_rows)
+
+
+def split_rows(data_folder, *split_dates):
+    """Header and the last season's rows split at each of split_dates (file order kept)."""
+    header, rows = yearly_lines(data_folder, YEARS[-1])
+    date = header.rstrip('\n').split(',').index('tourney_date')
+    parts = [[] for _ in range(len(split_dates) + 1)]
+    for row in rows:
+        parts[sum(row.split(',')[date] >= d for d in split_dates)].append(row)
+    assert all(parts)
+    return header, parts
+
+
+def read_output(output_dir, name):
+    # appended rows are written in match order, a full build keeps file order
+    df = pd.read_csv(os.path.join(output_dir, output_name(name)))
+    return df.sort_values(['tourney_id', 'match_num'], kind='stable').reset_index(drop=True)
+
+
+def assert_same_outputs(output_dir, expected_dir):
+    """Same matches with the same features in both outputs."""
+    for name in PROJECTIONS:
+        pd.testing.assert_frame_equal(read_output(output_dir, name), read_output(expected_dir, name))
+
+
+def test_incremental_append_matches_full_build(data_folder, tmp_path, capsys):
+    header, (early, first, second) = split_rows(data_folder, SPLIT_DATE, SECOND_SPLIT_DATE)
+    folder, output_dir, expected_dir = tmp_path / 'data', str(tmp_path / 'output'), str(tmp_path / 'expected')
+
+    write_season(folder, data_folder, header, early)
+    run(tuple(PROJECTIONS), str(folder), output_dir)
+    # the new matches are appended to the last season's file in two steps, so the
+    # second append reads the state the first one saved
+    for rows in (first, first + second):
+        write_season(folder, data_folder, header, early + rows)
+        capsys.readouterr()
+        run(tuple(PROJECTIONS), str(folder), output_dir, incremental=True)
+        out = capsys.readouterr().out
+        assert 'Incremental build: appended' in out and 'Full build' not in out
+
+    run(tuple(PROJECTIONS), str(folder), expected_dir)
+    assert_same_outputs(output_dir, expected_dir)
+
+
+def test_incremental_backdated_rows_fall_back_to_full_build(data_folder, tmp_path, capsys):
+    header, (early, late) = split_rows(data_folder, SPLIT_DATE)
+    folder, output_dir, expected_dir = tmp_path / 'data', str(tmp_path / 'output'), str(tmp_path / 'expected')
+
+    # the checkpoint already holds the late matches, then earlier-dated ones are appended
+    backdated, kept = early[:50], early[50:]
+    write_season(folder, data_folder, header, kept + late)
+    run(tuple(PROJECTIONS), str(folder), output_dir)
+    write_season(folder, data_folder, header, kept + late + backdated)
+    capsys.readouterr()
+    run(tuple(PROJECTIONS), str(folder), output_dir, incremental=True)
+    out = capsys.readouterr().out
+    assert 'older than the checkpoint' in out and 'Full build' in out
+
+    run(tuple(PROJECTIONS), str(folder), expected_dir)
+    assert_same_outputs(output_dir, expected_dir)
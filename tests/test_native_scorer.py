@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.data_engineer.feature_pipeline import output_name
+from src.model.benchmark_scoring import dataframe_predict
+from src.model.loader import _load_data
+from src.model.native_scorer import NativeScorer
+from src.model.player_index import H2HIndex, PlayerIndex
+from src.model.train import make_model
+from src.model.training_data import CAT_FEATURES, FEATURES, TARGET, build_symmetric_frame, load_training_frame
+
+
+@pytest.fixture(scope='module')
+def scorer(output_dir):
+    """NativeScorer over a small model trained on the feature datasets of the fixture seasons."""
+    train = build_symmetric_frame(load_training_frame(os.path.join(output_dir, output_name('full'))))
+    model = make_model({'iterations': 50, 'depth': 4}, thread_count=1, early_stopping_rounds=None)
+    model.set_params(allow_writing_files=False)
+    model.fit(train[FEATURES], train[TARGET], cat_features=CAT_FEATURES)
+
+    df = _load_data(os.path.join(output_dir, output_name('light')))
+    player_index = PlayerIndex.from_frame(df)
+    return NativeScorer(model, player_index, H2HIndex.from_frame(df, player_index))
+
+
+def pairs(scorer, n=300):
+    """Random pairs (all hands, missing stats) plus pairs that met."""
+    rng = np.random.default_rng(0)
+    names = np.array(scorer.player_index.names, dtype=object)
+    found = names[rng.integers(len(names), size=(n, 2))].tolist()
+    for row in rng.integers(len(scorer.h2h_index.keys), size=n // 3):
+        low, high = divmod(int(scorer.h2h_index.keys[row]), len(scorer.player_index))
+        found.append([names[low], names[high]])
+    return found
+
+
+def test_native_scorer_matches_dataframe_path(scorer):
+    player_index, h2h_index = scorer.player_index, scorer.h2h_index
+    for p1, p2 in pairs(scorer):
+        expected = dataframe_predict(scorer.model, player_index.stats, h2h_index.winrate, p1, p2)
+        assert scorer.predict(p1, p2) == pytest.approx(expected, abs=1e-12)
+        stats = scorer.predict_stats(player_index.stats(p1), player_index.stats(p2),
+                                     h2h_index.winrate(p1, p2), h2h_index.winrate(p2, p1))
+        assert stats == pytest.approx(expected, abs=1e-12)
+
+
+def test_native_scorer_unknown_player(scorer):
+    with pytest.raises(ValueError):
+        scorer.predict(scorer.player_index.names[0], 'Nobody Known')
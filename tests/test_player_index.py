@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_engineer.feature_pipeline import output_name
+from src.data_engineer.match_order import chronological_order
+from src.model.loader import _load_data
+from src.model.player_index import NUMERIC_FIELDS, STAT_COLUMNS, PlayerIndex
+
+
+@pytest.fixture(scope='module')
+def light(output_dir):
+    return _load_data(os.path.join(output_dir, output_name('light')))
+
+
+def test_player_index_uses_last_match_in_match_order(light):
+    index = PlayerIndex.from_frame(light)
+
+    # each player's last match, replayed in match order (not file order: the yearly
+    # files list a tournament's rounds from the final down)
+    last = {}
+    for row in chronological_order(light).tolist():
+        last[light['winner_id'].iat[row]] = (row, 'winner')
+        last[light['loser_id'].iat[row]] = (row, 'loser')
+
+    assert len(index) == len(last)
+    for i, player_id in enumerate(index.ids.tolist()):
+        row, side = last[player_id]
+        assert index.names[i] == light[f'{side}_name'].iat[row]
+        for field, value in zip(NUMERIC_FIELDS, index.values[i].tolist()):
+            expected = light[f'{side}_{STAT_COLUMNS[field]}'].iat[row]
+            assert (pd.isna(value) and pd.isna(expected)) or value == expected, (player_id, field)